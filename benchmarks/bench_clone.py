@@ -0,0 +1,59 @@
+# bench_clone.py
+'''python benchmarks/bench_clone.py --maps "maps/*.txt"
+
+clones per second of GameState.clone() / RobotController.clone() versus copy.deepcopy,
+and make/unmake per second with the undo journal (one environment tick + a move per bot, then undo)
+'''
+
+import argparse
+import copy
+import glob
+import os
+
+from bench_util import build_game_state, rate
+
+from game_constants import Team
+from robot_controller import RobotController
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maps", default="maps/*.txt", help="glob of map files")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = ap.parse_args()
+
+    print(f"{'map':<16} {'size':>7} {'deepcopy/s':>11} {'clone/s':>9} {'speedup':>8} {'rc deepcopy/s':>14} {'rc clone/s':>11} {'make/unmake/s':>14}")
+    for path in sorted(glob.glob(args.maps)):
+        gs = build_game_state(path)
+        for _ in range(5):
+            gs.start_turn()
+        rc = RobotController(Team.RED, gs)
+
+        deep = rate(lambda: copy.deepcopy(gs), args.seconds)
+        clone = rate(gs.clone, args.seconds)
+        rc_deep = rate(lambda: copy.deepcopy(rc), args.seconds)
+        rc_clone = rate(rc.clone, args.seconds)
+
+        sim = rc.clone()
+        sim.start_journal()
+        sim_state = sim._RobotController__game_state
+        bot_ids = sim.get_team_bot_ids(Team.RED)
+
+        def make_unmake():
+            mark = sim.journal_mark()
+            sim_state.start_turn()
+            for bot_id in bot_ids:
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    if sim.move(bot_id, dx, dy):
+                        break
+            sim.undo(mark)
+
+        unmake = rate(make_unmake, args.seconds)
+
+        size = f"{gs.red_map.width}x{gs.red_map.height}"
+        name = os.path.basename(path)
+        print(f"{name:<16} {size:>7} {deep:>11.0f} {clone:>9.0f} {clone / deep:>7.1f}x {rc_deep:>14.0f} {rc_clone:>11.0f} {unmake:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
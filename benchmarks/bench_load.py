@@ -0,0 +1,38 @@
+# bench_load.py
+'''python benchmarks/bench_load.py --maps "maps/*.txt"
+
+map loads per second: load_map_from_txt (parse + distance neighbour table), load_map_cached served from a
+warm cache in a temporary directory, and the full load_two_team_maps_and_orders Game.__init__ uses
+'''
+
+import argparse
+import glob
+import os
+import tempfile
+
+from bench_util import rate
+
+from map_processor import MAP_CACHE_ENV, load_map_from_txt, load_map_cached, load_two_team_maps_and_orders
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maps", default="maps/*.txt", help="glob of map files")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = ap.parse_args()
+
+    print(f"{'map':<16} {'size':>7} {'parse/s':>8} {'cached/s':>9} {'two-team/s':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ[MAP_CACHE_ENV] = tmp
+        for path in sorted(glob.glob(args.maps)):
+            parse = rate(lambda: load_map_from_txt(path), args.seconds)
+            m = load_map_cached(path).map_obj
+            cached = rate(lambda: load_map_cached(path), args.seconds)
+            two_team = rate(lambda: load_two_team_maps_and_orders(path), args.seconds)
+
+            size = f"{m.width}x{m.height}"
+            print(f"{os.path.basename(path):<16} {size:>7} {parse:>8.0f} {cached:>9.0f} {two_team:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
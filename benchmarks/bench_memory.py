@@ -0,0 +1,60 @@
+# bench_memory.py
+'''python benchmarks/bench_memory.py --maps "maps/*.txt" --scale 1 4
+
+bytes held by one game (GameState with both maps, bots and orders, measured with tracemalloc,
+not counting the distance matrix both maps share) and by one GameState.clone() of it, which is
+what every rollout copies; --scale tiles each map scale x scale times like bench_tick.py
+'''
+
+import argparse
+import gc
+import glob
+import os
+import tempfile
+import tracemalloc
+
+from bench_util import build_game_state, rate
+from bench_tick import write_tiled_map
+
+
+def traced_size(build) -> int:
+    '''net bytes still allocated after build() returns (the result is kept alive while measuring)'''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maps", default="maps/*.txt", help="glob of map files")
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 4], help="tile each map this many times per side")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time per clone() measurement")
+    args = ap.parse_args()
+
+    print(f"{'map':<20} {'size':>8} {'tiles':>6} {'game KiB':>9} {'clone KiB':>10} {'B/tile':>7} {'clone()/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in sorted(glob.glob(args.maps)):
+            for scale in args.scale:
+                p = path if scale == 1 else write_tiled_map(path, scale, tmp)
+                gs = build_game_state(p)
+                dm = gs.red_map.get_distances()
+                shared = dm.index.nbytes + dm.cells.nbytes
+
+                game = traced_size(lambda: build_game_state(p)) - shared
+                clone = traced_size(gs.clone)
+                clones = rate(gs.clone, args.seconds)
+
+                m = gs.red_map
+                n = 2 * m.width * m.height
+                name = os.path.basename(path) if scale == 1 else f"{scale}x_{os.path.basename(path)}"
+                size = f"{m.width}x{m.height}"
+                print(f"{name:<20} {size:>8} {n:>6} {game / 1024:>9.0f} {clone / 1024:>10.0f} {clone / n:>7.0f} {clones:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# bench_observe.py
+'''python benchmarks/bench_observe.py --maps "maps/*.txt"
+
+calls per second of the RobotController observation methods bots use inside their turn loops;
+repeated calls with no state change in between are served from the per-turn observation cache
+'''
+
+import argparse
+import copy
+import glob
+import os
+
+from bench_util import build_game_state, rate
+
+from game_constants import Team
+from robot_controller import RobotController
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maps", default="maps/*.txt", help="glob of map files")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = ap.parse_args()
+
+    print(f"{'map':<16} {'size':>7} {'deepcopy map/s':>15} {'get_map/s':>10} {'get_tile/s':>11} {'get_orders/s':>13} {'get_bot_state/s':>16}")
+    for path in sorted(glob.glob(args.maps)):
+        gs = build_game_state(path)
+        rc = RobotController(Team.RED, gs)
+        x, y = gs.red_map.width // 2, gs.red_map.height // 2
+
+        deep = rate(lambda: copy.deepcopy(gs.red_map), args.seconds)
+        get_map = rate(lambda: rc.get_map(Team.RED), args.seconds)
+        get_tile = rate(lambda: rc.get_tile(Team.RED, x, y), args.seconds)
+        get_orders = rate(lambda: rc.get_orders(Team.RED), args.seconds)
+        bot_id = rc.get_team_bot_ids(Team.RED)[0]
+        get_bot_state = rate(lambda: rc.get_bot_state(bot_id), args.seconds)
+
+        size = f"{gs.red_map.width}x{gs.red_map.height}"
+        print(f"{os.path.basename(path):<16} {size:>7} {deep:>15.0f} {get_map:>10.0f} {get_tile:>11.0f} {get_orders:>13.0f} {get_bot_state:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
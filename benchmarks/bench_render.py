@@ -0,0 +1,64 @@
+# bench_render.py
+'''python benchmarks/bench_render.py --map maps/v1.txt --turns 200
+
+Renderer.render_once() frames per second over the states of a real game (bots play the turns first,
+a render_snapshot() of every turn, with the tiles it changed, is replayed into the renderer), with the fps cap lifted.
+uses SDL's dummy video driver unless SDL_VIDEODRIVER is already set, so it runs without a display
+'''
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import bench_util  # noqa: F401  (puts src/ on sys.path)
+
+from game import Game
+from render import Renderer
+from render_process import render_snapshot
+
+
+def record_states(red: str, blue: str, map_path: str, turns: int) -> list:
+    '''(snapshot, tiles changed since the previous one) after each of the first turns of a game'''
+    g = Game(red, blue, map_path)
+    g.game_state.tile_log = {}
+    states = []
+    for _ in range(turns):
+        g.game_state.start_turn()
+        g.call_player(g.red_controller.get_team())
+        g.call_player(g.blue_controller.get_team())
+        gs = render_snapshot(g.game_state)
+        states.append((gs, gs.tile_log))
+    return states
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--red", default="bots/tostiti.py", help="red bot file")
+    ap.add_argument("--blue", default="bots/tostiti.py", help="blue bot file")
+    ap.add_argument("--map", default="maps/v1.txt", help="map file")
+    ap.add_argument("--turns", type=int, default=200, help="turns to record and render")
+    ap.add_argument("--repeat", type=int, default=3, help="passes over the recorded turns")
+    args = ap.parse_args()
+
+    states = record_states(args.red, args.blue, args.map, args.turns)
+    r = Renderer(states[0][0])
+
+    frames = 0
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        #every pass starts with a full scan, the renderer drains the logs it is handed so each frame gets a copy
+        for i, (gs, log) in enumerate(states):
+            gs.tile_log = dict(log) if i > 0 else None
+            r.gs = gs
+            r.render_once(fps_cap=0)
+            frames += 1
+    dt = time.perf_counter() - t0
+    r.close()
+
+    print(f"{os.path.basename(args.map)}: {frames} frames in {dt:.2f}s, {frames / dt:.0f} frames/s ({dt / frames * 1000:.2f} ms/frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench_startup.py
+'''python benchmarks/bench_startup.py --map maps/map1.txt --runs 5
+
+engine startup in fresh interpreters: `import game`, Game(...) and the first start_turn(), with the
+slowest imports from a `python -X importtime` report (cumulative microseconds, as in that report);
+also says whether pygame was loaded, which only --render games should do
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from bench_util import SRC_DIR
+
+#runs in the child interpreter, prints one json line of timings
+CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import game
+t1 = time.perf_counter()
+g = game.Game(sys.argv[1], sys.argv[2], sys.argv[3])
+t2 = time.perf_counter()
+g.game_state.start_turn()
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "init": t2 - t1, "first_turn": t3 - t2, "pygame": "pygame" in sys.modules}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    '''module -> cumulative microseconds from a -X importtime report'''
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        out[parts[2].strip()] = int(parts[1])
+    return out
+
+
+def run_child(red: str, blue: str, map_path: str) -> tuple:
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="hide")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, red, blue, map_path],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(proc.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--red", default="bots/tostiti.py", help="red bot file")
+    ap.add_argument("--blue", default="bots/tostiti.py", help="blue bot file")
+    ap.add_argument("--map", default="maps/map1.txt", help="map file")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters to time (medians are shown)")
+    ap.add_argument("--top", type=int, default=12, help="slowest imports to list")
+    args = ap.parse_args()
+
+    paths = [os.path.abspath(p) for p in (args.red, args.blue, args.map)]
+    runs = [run_child(*paths) for _ in range(args.runs)]
+
+    print(f"{'stage':<22} {'median ms':>10}")
+    for stage in ("import", "init", "first_turn"):
+        print(f"{stage:<22} {statistics.median(t[stage] for t, _ in runs) * 1000:>10.1f}")
+    print(f"{'pygame imported':<22} {str(runs[0][0]['pygame']):>10}")
+
+    modules = runs[0][1].keys()
+    cumulative = {m: statistics.median(r[1].get(m, 0) for r in runs) for m in modules}
+    print(f"\n{'module':<40} {'cumulative ms':>14}")
+    for name, us in sorted(cumulative.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<40} {us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_tick.py
+'''python benchmarks/bench_tick.py --maps "maps/*.txt" --scale 1 4 16
+
+GameState.start_turn() calls per second, on each map and on the same map tiled scale x scale times
+to stand in for large generated maps (environment ticking should not grow with map area)
+'''
+
+import argparse
+import glob
+import os
+import tempfile
+
+from bench_util import build_game_state, rate
+
+from map_processor import read_nonempty_noncomment_lines, extract_optional_switch_config, split_layout_and_orders
+
+
+def write_tiled_map(path: str, scale: int, out_dir: str) -> str:
+    '''copy of the map file with its layout repeated scale x scale times, orders kept'''
+    with open(path, "r", encoding="utf-8") as f:
+        lines = read_nonempty_noncomment_lines(f.readlines())
+    lines, _, _ = extract_optional_switch_config(lines)
+    layout, orders = split_layout_and_orders(lines)
+
+    rows = [row * scale for row in layout] * scale
+    out = os.path.join(out_dir, f"{scale}x_{os.path.basename(path)}")
+    with open(out, "w", encoding="utf-8") as f:
+        f.write("\n".join(rows) + "\n")
+        if orders:
+            f.write("ORDERS:\n" + "\n".join(orders) + "\n")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--maps", default="maps/*.txt", help="glob of map files")
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 4, 16], help="tile each map this many times per side")
+    ap.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    args = ap.parse_args()
+
+    print(f"{'map':<16} {'scale':>5} {'size':>9} {'start_turn/s':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in sorted(glob.glob(args.maps)):
+            for scale in args.scale:
+                map_path = path if scale == 1 else write_tiled_map(path, scale, tmp)
+                gs = build_game_state(map_path)
+                per_s = rate(gs.start_turn, args.seconds)
+
+                size = f"{gs.red_map.width}x{gs.red_map.height}"
+                print(f"{os.path.basename(path):<16} {scale:>5} {size:>9} {per_s:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
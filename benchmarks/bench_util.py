@@ -0,0 +1,32 @@
+# bench_util.py
+'''shared setup for the scripts in benchmarks/, run them from the repo root'''
+
+import os
+import sys
+import time
+from typing import Callable
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from game import new_game_state
+from game_state import GameState
+
+
+def build_game_state(map_path: str) -> GameState:
+    '''the state Game.__init__ builds, without importing any bots'''
+    return new_game_state(map_path)[0]
+
+
+def rate(fn: Callable[[], object], seconds: float) -> float:
+    '''calls per second of fn over roughly the given wall time'''
+    n = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while True:
+        fn()
+        n += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return n / (now - t0)
@@ -55,7 +55,7 @@ class MonteCarloTreeSearchNode():
         return self._number_of_visits
     def expand(self):
         action = self._untried_actions.pop()
-        new_controller = copy.deepcopy(self.controller)
+        new_controller = self.controller.clone()
         self.botPlayer.make_move(new_controller, action)
         child_node = MonteCarloTreeSearchNode(
             new_controller, 
@@ -72,7 +72,7 @@ class MonteCarloTreeSearchNode():
     
 
     def rollout(self):
-        rollout_controller = copy.deepcopy(self.controller)
+        rollout_controller = self.controller.clone()
         depth = 0
         max_depth = 4  # Limit rollout depth to prevent infinite loops
         while not self.botPlayer.is_game_over(rollout_controller) and depth < max_depth:
@@ -788,7 +788,7 @@ class BotPlayer:
                 
                 # Create root node with current controller state
         else: 
-            new_controller = copy.deepcopy(controller)
+            new_controller = controller.clone()
             root_node = MonteCarloTreeSearchNode(controller=new_controller, botPlayer= self)
             
             
@@ -0,0 +1,312 @@
+# bot_process.py
+"""
+Runs a BotPlayer inside a long-lived child process.
+
+The engine keeps the only real GameState. The child gets a proxy controller whose
+public method calls are sent back over a pipe and executed on the engine's
+RobotController, so a bot that is killed mid-turn can never touch state again.
+
+Every reply carries the state stamp (turn, GameState.version) and the per-team map
+versions after the call. The proxy keeps read-only results of the calls that change
+nothing (get_*, can_*) until the bot makes any other call or the stamp moves, and the
+map until that team's map version moves, so repeated reads in a turn loop never cross
+the pipe and the map is pickled once per change.
+
+Time the engine spends serving calls is not charged to the bot's --timeout, up to a
+hard wall-clock limit of WALL_LIMIT_FACTOR times the timeout per turn.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import time
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+from game_constants import Team
+from views import read_only
+
+
+class BotProcessError(Exception):
+    pass
+
+
+#RobotController calls that change nothing; the proxy serves repeats from its cache until the bot makes
+#a call not listed here (which may spend a move or action budget) or the state stamp moves.
+#get_turn, get_team, get_enemy_team and get_map have their own methods on the proxy
+CACHED_CALLS = frozenset((
+    "get_orders", "get_team_bot_ids", "get_team_money", "get_state_hash", "get_bot_state", "get_tile",
+    "get_nearest_tile", "get_distance", "get_next_step", "find_path", "get_switch_info",
+    "can_move", "can_buy", "can_start_cook", "can_submit", "can_switch_maps",
+))
+
+#the first can_move of a bot since the cache was dropped asks for all its steps in one round trip
+_STEPS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+
+#a turn ends after timeout_s of bot time or WALL_LIMIT_FACTOR * timeout_s of wall time, whichever comes first
+WALL_LIMIT_FACTOR = 4.0
+
+
+def state_stamp(game_state) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    '''((turn, version), (red map version, blue map version)), sent with every reply'''
+    mv = game_state.map_version
+    return (game_state.turn, game_state.version), (mv[Team.RED], mv[Team.BLUE])
+
+
+# ----------------------------
+# Child side
+# ----------------------------
+
+class ControllerProxy:
+    '''stand-in for RobotController inside the bot process, public calls are forwarded to the engine'''
+
+    def __init__(self, conn):
+        self._conn = conn
+        #see set_stamp
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._map_stamp: Tuple[int, int] = (-1, -1)
+        self._results: Dict[tuple, Any] = {}
+        #Team -> (map version, read-only map)
+        self._maps: Dict[Any, Tuple[int, Any]] = {}
+        #a controller's team never changes
+        self._team: Optional[Team] = None
+
+    def set_stamp(self, stamp) -> None:
+        '''engine state after the last message, cached results from an older state are dropped'''
+        state, maps = stamp
+        if state != self._stamp:
+            self._stamp = state
+            self._results = {}
+        self._map_stamp = maps
+
+    def _call(self, name: str, args, kwargs) -> Any:
+        self._conn.send(("call", name, args, kwargs))
+        kind, value, stamp = self._conn.recv()
+        self.set_stamp(stamp)
+        if kind == "err":
+            raise value
+        return value
+
+    def _prefetch(self, key: tuple) -> None:
+        '''fetch key and the calls that usually follow it in one round trip, results go to the cache'''
+        name, args, kwargs = key
+        keys = [key]
+        if name == "can_move" and len(args) == 3 and not kwargs:
+            keys += [k for k in ((name, (args[0], dx, dy), ()) for dx, dy in _STEPS) if k != key]
+        self._conn.send(("calls", keys))
+        kind, replies, stamp = self._conn.recv()
+        self.set_stamp(stamp)
+        if kind == "err":
+            raise replies
+        for k, (kind, value) in zip(keys, replies):
+            if kind == "ok":
+                self._results[k] = read_only(value)
+        kind, value = replies[0]
+        if kind == "err":
+            raise value
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name in CACHED_CALLS:
+            def call(*args, **kwargs):
+                key = (name, args, tuple(kwargs.items()))
+                try:
+                    return self._results[key]
+                except KeyError:
+                    pass
+                except TypeError:
+                    #unhashable arguments (eg a list of goals), not cached
+                    return read_only(self._call(name, args, kwargs))
+                self._prefetch(key)
+                return self._results[key]
+        else:
+            def call(*args, **kwargs):
+                #budgets live in the engine's controller and are not in the stamp, forget everything
+                self._results = {}
+                return self._call(name, args, kwargs)
+
+        #cache so repeated calls skip __getattr__
+        setattr(self, name, call)
+        return call
+
+    def get_turn(self) -> int:
+        return self._stamp[0]
+
+    def get_team(self) -> Team:
+        if self._team is None:
+            self._team = self._call("get_team", (), {})
+        return self._team
+
+    def get_enemy_team(self) -> Team:
+        return Team.RED if self.get_team() == Team.BLUE else Team.BLUE
+
+    def get_map(self, team):
+        '''read-only map, fetched again only after one of its tiles changed'''
+        version = self._map_stamp[0 if team == Team.RED else 1]
+        cached = self._maps.get(team)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        m = read_only(self._call("get_map", (team,), {}))
+        self._maps[team] = (version, m)
+        return m
+
+    #copying the proxy would copy the pipe: moves on the "copy" would reach the real game, and the copy's
+    #connection closes the shared pipe when it is garbage collected. copies are controller.clone() instead,
+    #a private RobotController over a copy of the game, which is what copy.deepcopy gives in-process
+
+    def __copy__(self):
+        return self.clone()
+
+    def __deepcopy__(self, memo):
+        return self.clone()
+
+    def __reduce__(self):
+        raise TypeError("the controller of an isolated bot cannot be pickled, use controller.clone() for a private copy")
+
+
+def _worker_main(conn, module_name: str, bot_path: str, map_copy) -> None:
+    '''child process loop: build the player once, then play a turn per "turn" message'''
+    from game import import_file
+
+    try:
+        player = import_file(module_name, bot_path).BotPlayer(map_copy)
+    except BaseException:
+        conn.send(("init_err", traceback.format_exc()))
+        return
+    conn.send(("init_ok", None))
+
+    controller = ControllerProxy(conn)
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+
+        if msg[0] == "stop":
+            return
+
+        if msg[0] == "turn":
+            controller.set_stamp(msg[1])
+            try:
+                player.play_turn(controller)
+                conn.send(("done", None))
+            except BaseException as e:
+                conn.send(("crash", f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+
+
+# ----------------------------
+# Engine side
+# ----------------------------
+
+class BotProcess:
+    '''
+    Engine handle on one bot process
+
+    play_turn() returns (status, detail) where status is "ok", "timeout" or "crash".
+    A timed out process is killed, later turns report "crash".
+    '''
+
+    def __init__(self, module_name: str, bot_path: str, map_copy, init_timeout_s: Optional[float] = None):
+        ctx = mp.get_context()
+        self.__conn, child_conn = ctx.Pipe()
+        self.__proc = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, module_name, bot_path, map_copy),
+            daemon=True,
+        )
+        self.__proc.start()
+        child_conn.close()
+
+        if not self.__conn.poll(init_timeout_s):
+            self.kill()
+            raise BotProcessError(f"{bot_path} did not finish __init__ within {init_timeout_s}s")
+
+        try:
+            kind, detail = self.__conn.recv()
+        except EOFError:
+            self.kill()
+            raise BotProcessError(f"{bot_path} process exited during __init__")
+
+        if kind != "init_ok":
+            self.kill()
+            raise BotProcessError(f"{bot_path} failed in __init__:\n{detail}")
+
+    def is_alive(self) -> bool:
+        return self.__proc.is_alive()
+
+    def play_turn(self, controller, game_state, timeout_s: float) -> Tuple[str, Optional[str]]:
+        '''
+        signal a turn and serve controller calls until the bot is done or out of time;
+        serving time moves the deadline back, but never past the wall-clock limit
+        '''
+        if not self.__proc.is_alive():
+            return "crash", "bot process is not running"
+
+        start = time.time()
+        deadline = start + timeout_s
+        wall_deadline = start + timeout_s * WALL_LIMIT_FACTOR
+        try:
+            self.__conn.send(("turn", state_stamp(game_state)))
+            while True:
+                remaining = min(deadline, wall_deadline) - time.time()
+                if remaining <= 0 or not self.__conn.poll(remaining):
+                    self.kill()
+                    return "timeout", None
+
+                served_from = time.time()
+                msg = self.__conn.recv()
+                kind = msg[0]
+
+                if kind == "done":
+                    return "ok", None
+                if kind == "crash":
+                    return "crash", msg[1]
+                if kind == "call":
+                    status, value = self.__run_call(controller, msg[1], msg[2], msg[3])
+                    self.__reply(status, value, game_state, msg[1])
+                    deadline += time.time() - served_from
+                elif kind == "calls":
+                    replies = [self.__run_call(controller, name, args, dict(kwargs)) for name, args, kwargs in msg[1]]
+                    self.__reply("ok", replies, game_state, "batched")
+                    deadline += time.time() - served_from
+
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            self.kill()
+            return "crash", f"bot process died: {type(e).__name__}"
+
+    @staticmethod
+    def __run_call(controller, name: str, args, kwargs) -> Tuple[str, Any]:
+        '''run one proxied controller method against the real controller'''
+        try:
+            if name.startswith("_"):
+                raise AttributeError(f"RobotController has no public attribute {name}")
+            return "ok", getattr(controller, name)(*args, **kwargs)
+        except Exception as e:
+            return "err", e
+
+    def __reply(self, kind: str, value: Any, game_state, name: str) -> None:
+        stamp = state_stamp(game_state)
+        try:
+            self.__conn.send((kind, value, stamp))
+        except Exception as e:
+            #unpicklable return value or exception, bot still gets an error it can see
+            self.__conn.send(("err", BotProcessError(f"{name}() result could not be sent: {e}"), stamp))
+
+    def kill(self) -> None:
+        '''hard stop, safe to call more than once'''
+        if self.__proc.is_alive():
+            self.__proc.kill()
+        self.__proc.join()
+        self.__conn.close()
+
+    def close(self) -> None:
+        '''polite stop, falls back to kill'''
+        if self.__proc.is_alive():
+            try:
+                self.__conn.send(("stop", None))
+            except Exception:
+                pass
+            self.__proc.join(1.0)
+        self.kill()
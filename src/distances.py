@@ -0,0 +1,235 @@
+# distances.py
+"""
+Walking distances over a map's walkable cells.
+
+Bots move one step in any of 8 directions onto a walkable tile (see GameState.move_bot),
+so the distance between two walkable cells is the number of moves on an empty map.
+Building a matrix only makes a neighbour table of the walkable cells (NumPy, O(width * height));
+the distances from a cell are one BFS over that table the first time they are asked for,
+and are kept, so every source costs O(walkable cells) once however big or winding the map is.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+UNREACHABLE = -1
+
+#first-step preference for next_step(), straight moves before diagonals
+STEP_ORDER: Tuple[Tuple[int, int], ...] = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def walkable_mask(m) -> np.ndarray:
+    '''[x][y] bool array of the map's walkable tiles (Map keeps one up to date)'''
+    return m.walkable
+
+
+class DistanceMatrix:
+    '''
+    walking distances between walkable cells of one map layout, static for the whole game
+    (bots standing in the way are ignored)
+
+    index[x, y] is the row/column of a walkable cell, -1 otherwise
+    cells[i] is the (x, y) of row i
+    neighbours[i] are the rows of the walkable cells one step from cells[i], in STEP_ORDER
+    row(i)[j] is the number of moves from cells[i] to cells[j], -1 if unreachable (built on first use)
+    '''
+
+    #all lookups only fill the lazy row cache, views.ObjectView lets bots call them directly
+    VIEW_SAFE_METHODS = ("cell_index", "row", "distance", "distances_from", "next_step", "path")
+
+    def __init__(self, walkable: np.ndarray):
+        self.width, self.height = walkable.shape
+        self.walkable = walkable
+        self.cells = np.argwhere(walkable)
+        n = len(self.cells)
+
+        self.index = np.full(walkable.shape, -1, dtype=np.int32)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(n, dtype=np.int32)
+
+        #plain tuple copies for per-cell python loops (BFS, find_path), numpy scalar indexing is slow there
+        self.index_list: Tuple[Tuple[int, ...], ...] = tuple(map(tuple, self.index.tolist()))
+        self.cell_list: Tuple[Tuple[int, ...], ...] = tuple(map(tuple, self.cells.tolist()))
+        self.neighbours: Tuple[Tuple[int, ...], ...] = self.__neighbour_table()
+
+        self.__rows: Dict[int, np.ndarray] = {}
+        self.__freeze()
+
+    def __neighbour_table(self) -> Tuple[Tuple[int, ...], ...]:
+        '''walkable neighbours of every walkable cell, one shifted lookup per direction'''
+        n = len(self.cells)
+        table = np.full((n, len(STEP_ORDER)), -1, dtype=np.int32)
+        xs, ys = self.cells[:, 0], self.cells[:, 1]
+        for k, (dx, dy) in enumerate(STEP_ORDER):
+            nx, ny = xs + dx, ys + dy
+            inside = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+            table[inside, k] = self.index[nx[inside], ny[inside]]
+        return tuple(tuple(j for j in r if j >= 0) for r in table.tolist())
+
+    def __freeze(self) -> None:
+        '''one matrix is shared by both team maps and the bots' map copies, so nobody may write to it'''
+        for arr in (self.walkable, self.cells, self.index, *self.__rows.values()):
+            arr.flags.writeable = False
+
+    def __setstate__(self, state: dict) -> None:
+        #numpy drops the read-only flag when pickling (map cache, --isolate-bots pipe)
+        self.__dict__.update(state)
+        self.__freeze()
+
+    @classmethod
+    def from_map(cls, m) -> DistanceMatrix:
+        return cls(walkable_mask(m))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def row(self, i: int) -> np.ndarray:
+        '''distances from cells[i] to every cell, indexed like cells'''
+        row = self.__rows.get(i)
+        if row is None:
+            row = self.__single_source(i)
+            row.flags.writeable = False
+            self.__rows[i] = row
+        return row
+
+    def __single_source(self, i: int) -> np.ndarray:
+        '''BFS over the neighbour table, one level at a time'''
+        nbrs = self.neighbours
+        row = [UNREACHABLE] * len(nbrs)
+        row[i] = 0
+        frontier = [i]
+        d = 0
+        while frontier:
+            d += 1
+            nxt = []
+            for c in frontier:
+                for j in nbrs[c]:
+                    if row[j] == UNREACHABLE:
+                        row[j] = d
+                        nxt.append(j)
+            frontier = nxt
+        return np.array(row, dtype=np.int32)
+
+    def cell_index(self, x: int, y: int) -> int:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.index[x, y])
+        return -1
+
+    def distance(self, ax: int, ay: int, bx: int, by: int) -> Optional[int]:
+        '''moves from (ax, ay) to (bx, by), None if either is not walkable or b can't be reached'''
+        i, j = self.cell_index(ax, ay), self.cell_index(bx, by)
+        if i < 0 or j < 0:
+            return None
+        #distances are symmetric: read the target's row, targets (stations) repeat far more than bot positions
+        d = int(self.row(j)[i])
+        return None if d == UNREACHABLE else d
+
+    def distances_from(self, x: int, y: int) -> Optional[np.ndarray]:
+        '''[x][y] grid of moves from (x, y) to every cell, -1 where unreachable or not walkable'''
+        i = self.cell_index(x, y)
+        if i < 0:
+            return None
+        grid = np.full((self.width, self.height), UNREACHABLE, dtype=np.int32)
+        grid[self.cells[:, 0], self.cells[:, 1]] = self.row(i)
+        return grid
+
+    def __step_towards(self, i: int, row_b: np.ndarray) -> Optional[Tuple[int, int]]:
+        '''first (dx, dy) from cells[i] that gets one move closer, by b's row'''
+        d = row_b[i]
+        if d <= 0:
+            return None
+        x, y = self.cell_list[i]
+        for dx, dy in STEP_ORDER:
+            j = self.cell_index(x + dx, y + dy)
+            if j >= 0 and row_b[j] == d - 1:
+                return (dx, dy)
+        return None
+
+    def next_step(self, ax: int, ay: int, bx: int, by: int) -> Optional[Tuple[int, int]]:
+        '''(dx, dy) of a first move on a shortest walk from a to b, None if already there or unreachable'''
+        i, j = self.cell_index(ax, ay), self.cell_index(bx, by)
+        if i < 0 or j < 0:
+            return None
+        return self.__step_towards(i, self.row(j))
+
+    def path(self, ax: int, ay: int, bx: int, by: int) -> Optional[List[Tuple[int, int]]]:
+        '''cells visited after a on a shortest walk to b (b last), [] if a == b, None if unreachable'''
+        if self.distance(ax, ay, bx, by) is None:
+            return None
+        #one row (b's) for the whole walk
+        row_b = self.row(self.cell_index(bx, by))
+        out: List[Tuple[int, int]] = []
+        x, y = ax, ay
+        while (x, y) != (bx, by):
+            dx, dy = self.__step_towards(self.cell_index(x, y), row_b)
+            x, y = x + dx, y + dy
+            out.append((x, y))
+        return out
+
+
+def find_path(
+    dm: DistanceMatrix,
+    start: Tuple[int, int],
+    goals: List[Tuple[int, int]],
+    blocked: Optional[Set[Tuple[int, int]]] = None,
+) -> Optional[List[Tuple[int, int]]]:
+    '''
+    A* from start to the closest reachable goal, stepping around blocked cells (eg other bots);
+    the static distance to the nearest goal is the heuristic, exact when nothing is blocked.
+    returns the cells visited after start (goal last), [] if start is a goal, None if no goal can be reached
+    '''
+    si = dm.cell_index(*start)
+    blocked_idx = {dm.cell_index(x, y) for (x, y) in blocked or ()}
+    blocked_idx.discard(si)
+    goal_idx = [g for g in (dm.cell_index(*goal) for goal in goals) if g >= 0 and g not in blocked_idx]
+    if si < 0 or not goal_idx:
+        return None
+    if si in goal_idx:
+        return []
+
+    #h[i] = static distance from cell i to the nearest goal
+    far = np.iinfo(np.int32).max
+    rows = np.stack([dm.row(g) for g in goal_idx]).astype(np.int32)
+    rows[rows == UNREACHABLE] = far
+    h = rows.min(axis=0).tolist()
+    if h[si] == far:
+        return None
+
+    goal_set = set(goal_idx)
+    index, cells, w, ht = dm.index_list, dm.cell_list, dm.width, dm.height
+    came_from: Dict[int, int] = {si: -1}
+    best_g: Dict[int, int] = {si: 0}
+    tie = 0
+    heap = [(int(h[si]), 0, tie, si)]
+
+    while heap:
+        _, g, _, i = heapq.heappop(heap)
+        if g > best_g[i]:
+            continue
+        if i in goal_set:
+            out: List[Tuple[int, int]] = []
+            while i != si:
+                out.append((cells[i][0], cells[i][1]))
+                i = came_from[i]
+            out.reverse()
+            return out
+
+        x, y = cells[i]
+        for dx, dy in STEP_ORDER:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < w and 0 <= ny < ht):
+                continue
+            j = index[nx][ny]
+            if j < 0 or j in blocked_idx or h[j] == far:
+                continue
+            ng = g + 1
+            if ng < best_g.get(j, ng + 1):
+                best_g[j] = ng
+                came_from[j] = i
+                tie += 1
+                heapq.heappush(heap, (ng + h[j], ng, tie, j))
+
+    return None
@@ -3,22 +3,27 @@
 '''python src/game.py --red bots/sample_bot.py --blue bots/sample_bot.py --map maps/tiny_map.txt --render'''
 
 import argparse
-import copy
 import importlib.util
-import json
 import os
 import sys
 import time
 import traceback
 from threading import Thread
-from typing import Optional, Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from game_constants import Team, GameConstants
+from game_constants import Team, GameConstants, REPLAY_FORMATS
 from game_state import GameState
 from robot_controller import RobotController
 
-from map_processor import load_two_team_maps_and_orders
-from render import Renderer
+from map_processor import ParsedMap, load_two_team_maps_and_orders, build_team_map
+
+#optional subsystems are imported where they are first needed: render pulls in pygame (and SDL),
+#which headless and tournament games never use (see benchmarks/bench_startup.py)
+if TYPE_CHECKING:
+    from bot_process import BotProcess
+    from replay import ReplayWriter
+    from render import Renderer
+    from render_process import RenderProcess
 
 
 def import_file(module_name: str, file_path: str):
@@ -51,6 +56,45 @@ def find_default_floor_spawn(m, prefer_center=True) -> Tuple[int, int]:
     return (0, 0)
 
 
+def new_game_state(map_path: str) -> Tuple[GameState, ParsedMap]:
+    '''game state for a map file (orders, switch window, bots at their spawns) and the parsed layout, no bots imported'''
+    map_red, map_blue, orders_red, orders_blue, parsed = load_two_team_maps_and_orders(map_path)
+
+    #create game state
+    gs = GameState(red_map=map_red, blue_map=map_blue)
+
+    #get midgame switch window from map
+    gs.switch_turn = getattr(parsed, "switch_turn", GameConstants.MIDGAME_SWITCH_TURN)
+    gs.switch_duration = getattr(parsed, "switch_duration", GameConstants.MIDGAME_SWITCH_DURATION)
+
+    #load orders into the game state
+    gs.add_orders(Team.RED, orders_red)
+    gs.add_orders(Team.BLUE, orders_blue)
+
+    #make next_order_id to avoid collisions if spawn_order() is useed later
+    max_id = 0
+    for o in orders_red:
+        max_id = max(max_id, o.order_id)
+    gs.next_order_id = max_id + 1
+
+    #put the bots in the parsed map
+    if parsed.spawns_red:
+        for (x, y) in parsed.spawns_red:
+            gs.add_bot(Team.RED, x, y)
+    else:
+        x, y = find_default_floor_spawn(gs.red_map)
+        gs.add_bot(Team.RED, x, y)
+
+    if parsed.spawns_blue:
+        for (x, y) in parsed.spawns_blue:
+            gs.add_bot(Team.BLUE, x, y)
+    else:
+        x, y = find_default_floor_spawn(gs.blue_map)
+        gs.add_bot(Team.BLUE, x, y)
+
+    return gs, parsed
+
+
 class Game:
     def __init__(
         self,
@@ -58,41 +102,29 @@ class Game:
         blue_bot_path: str,
         map_path: str,
         replay_path: Optional[str] = None,
+        replay_format: Optional[str] = None,
         render: bool = False,
         turn_limit: int = GameConstants.TOTAL_TURNS,
         per_turn_timeout_s: float = 0.5,
         fps_cap: int = 30,
+        isolate_bots: bool = False,
+        render_process: bool = False,
     ):
-        self.render_enabled = render
+        self.render_enabled = render or render_process
+        self.render_in_process = render_process
+        self.isolate_bots = isolate_bots
         self.turn_limit = turn_limit
         self.per_turn_timeout_s = per_turn_timeout_s
         self.fps_cap = fps_cap
 
         self.replay_path = replay_path
+        self.replay_writer: Optional["ReplayWriter"] = None
         if replay_path is not None:
-            os.makedirs(os.path.dirname(replay_path) or ".", exist_ok=True)
-
-        #load the maps
-        map_red, map_blue, orders_red, orders_blue, parsed = load_two_team_maps_and_orders(map_path)
-
-        #create game state
-        self.game_state = GameState(red_map=map_red, blue_map=map_blue)
-
-
-        #get midgame switch window from map
-        self.game_state.switch_turn = getattr(parsed, "switch_turn", GameConstants.MIDGAME_SWITCH_TURN)
-        self.game_state.switch_duration = getattr(parsed, "switch_duration", GameConstants.MIDGAME_SWITCH_DURATION)
-
-
-        #load orders into the game state
-        self.game_state.orders[Team.RED] = orders_red
-        self.game_state.orders[Team.BLUE] = orders_blue
+            from replay import make_replay_writer
+            self.replay_writer = make_replay_writer(replay_path, replay_format)
 
-        #make next_order_id to avoid collisions if spawn_order() is useed later
-        max_id = 0
-        for o in orders_red:
-            max_id = max(max_id, o.order_id)
-        self.game_state.next_order_id = max_id + 1
+        #load the maps, orders and bots
+        self.game_state, parsed = new_game_state(map_path)
 
         #import bots, need the play turn mechanic
         self.red_failed_init = False
@@ -101,7 +133,7 @@ class Game:
         #try to import
         try:
             red_name = os.path.basename(red_bot_path).rsplit(".", 1)[0]
-            self.red_player = import_file(red_name, red_bot_path).BotPlayer(copy.deepcopy(self.game_state.red_map))
+            self.red_player = self.load_player(red_name, red_bot_path, build_team_map(parsed, Team.RED))
         except Exception as e:
             self.red_failed_init = True
             print(f"[INIT] Red bot failed: {e}")
@@ -109,7 +141,7 @@ class Game:
 
         try:
             blue_name = os.path.basename(blue_bot_path).rsplit(".", 1)[0]
-            self.blue_player = import_file(blue_name, blue_bot_path).BotPlayer(copy.deepcopy(self.game_state.blue_map))
+            self.blue_player = self.load_player(blue_name, blue_bot_path, build_team_map(parsed, Team.BLUE))
         except Exception as e:
             self.blue_failed_init = True
             print(f"[INIT] Blue bot failed: {e}")
@@ -119,26 +151,22 @@ class Game:
         self.red_controller = RobotController(Team.RED, self.game_state)
         self.blue_controller = RobotController(Team.BLUE, self.game_state)
 
-        #put the bots in the parsed map
-        if parsed.spawns_red:
-            for (x, y) in parsed.spawns_red:
-                self.game_state.add_bot(Team.RED, x, y)
-        else:
-            x, y = find_default_floor_spawn(self.game_state.red_map)
-            self.game_state.add_bot(Team.RED, x, y)
-
-        if parsed.spawns_blue:
-            for (x, y) in parsed.spawns_blue:
-                self.game_state.add_bot(Team.BLUE, x, y)
-        else:
-            x, y = find_default_floor_spawn(self.game_state.blue_map)
-            self.game_state.add_bot(Team.BLUE, x, y)
-
-        #replay
-        self.replay: List[Dict[str, Any]] = []
-
-        #renderer if available
-        self.renderer = Renderer(self.game_state) if self.render_enabled else None
+        #renderer if available, in this process (throttles turns to fps_cap) or its own (see render_process.py)
+        self.renderer: Optional["Renderer"] = None
+        self.render_process: Optional["RenderProcess"] = None
+        if self.render_in_process:
+            from render_process import RenderProcess
+            self.render_process = RenderProcess(fps_cap=self.fps_cap)
+        elif self.render_enabled:
+            from render import Renderer
+            self.renderer = Renderer(self.game_state)
+
+    def load_player(self, module_name: str, bot_path: str, team_map):
+        '''BotPlayer in this process, or a BotProcess handle when bots are isolated; team_map is the bot's own copy'''
+        if self.isolate_bots:
+            from bot_process import BotProcess
+            return BotProcess(module_name, bot_path, team_map)
+        return import_file(module_name, bot_path).BotPlayer(team_map)
 
     def call_player(self, team: Team) -> bool:
         '''calls the player run code'''
@@ -153,6 +181,9 @@ class Game:
             player = self.blue_player
             controller = self.blue_controller
 
+        if self.isolate_bots:
+            return self.call_player_process(team, player, controller)
+
         ok = True
         exc: Optional[BaseException] = None
 
@@ -180,11 +211,30 @@ class Game:
             return False
         return True
 
-    def record_turn(self):
-        self.replay.append(self.game_state.to_dict()) #for the replay rile
+    def call_player_process(self, team: Team, player: "BotProcess", controller: RobotController) -> bool:
+        '''same contract as call_player, but the bot runs in its own process and is killed on timeout'''
+        t0 = time.time()
+        status, detail = player.play_turn(controller, self.game_state, self.per_turn_timeout_s)
+        dt = time.time() - t0
 
-    def render(self) -> bool:
-        '''render ONLY IF we want to render'''
+        if status == "timeout":
+            #dt includes the engine's time serving the bot's calls, which is not charged to the bot
+            print(f"[TURN RUNNER] {team.name} timed out ({dt:.3f}s wall, limit {self.per_turn_timeout_s:.3f}s of bot time), process killed")
+            return False
+        if status != "ok":
+            print(f"[TURN RUNNER] {team.name} crashed: {detail}")
+            return False
+        return True
+
+    def record_turn(self):
+        if self.replay_writer is not None:
+            self.replay_writer.write_turn(self.game_state) #for the replay file
+
+    def render(self, *, final: bool = False) -> bool:
+        '''render ONLY IF we want to render; False when the window was closed'''
+        if self.render_process is not None:
+            #never waits: frames the renderer can't keep up with are dropped
+            return self.render_process.publish(self.game_state, force=final)
         if not self.render_enabled or self.renderer is None:
             return True
         return self.renderer.render_once(fps_cap=self.fps_cap)
@@ -201,6 +251,10 @@ class Game:
         if not self.render():
             return None
 
+        #header goes out before the first turn for streaming formats
+        if self.replay_writer is not None:
+            self.replay_writer.begin(self.game_state)
+
         for _ in range(self.turn_limit):
             #start turn (money + environment + expirations)
             self.game_state.start_turn()
@@ -246,26 +300,28 @@ class Game:
             winner = None
 
         self.export_replay(winner)
-        return None
+        return winner
 
     def export_replay(self, winner: Optional[Team]):
-        '''json dump'''
-        if self.replay_path is None:
+        '''finish the replay file (json dump or jsonl trailer)'''
+        if self.replay_writer is None:
             return
-        payload = {
-            "winner": None if winner is None else winner.name,
-            "turns": len(self.replay),
-            "switch_turn_start": self.game_state.switch_turn,
-            "switch_turn_end": self.game_state.switch_turn + self.game_state.switch_duration, 
-            "replay": self.replay,
-        }
-        with open(self.replay_path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2)
+        self.replay_writer.finish(winner, self.game_state)
         print(f"[REPLAY] wrote {self.replay_path}")
 
     def close(self):
+        if self.replay_writer is not None:
+            self.replay_writer.close()
+        if self.isolate_bots:
+            if not self.red_failed_init:
+                self.red_player.close()
+            if not self.blue_failed_init:
+                self.blue_player.close()
         if self.renderer is not None:
             self.renderer.close()
+        if self.render_process is not None:
+            self.render(final=True)
+            self.render_process.close()
 
 
 def main():
@@ -275,10 +331,13 @@ def main():
     ap.add_argument("--blue", required=True, help="path to blue bot python file (defines BotPlayer)")
     ap.add_argument("--map", required=True, help="path to map text file (layout + optional ORDERS:)")
     ap.add_argument("--replay", default=None, help="optional output replay json path")
+    ap.add_argument("--replay-format", choices=REPLAY_FORMATS, default=None, help="replay format (default: jsonl for .jsonl paths, else json)")
     ap.add_argument("--render", action="store_true", help="enable pygame rendering")
+    ap.add_argument("--render-process", action="store_true", help="render in a separate process: turns run at full speed, frames the renderer can't keep up with are dropped")
     ap.add_argument("--turns", type=int, default=GameConstants.TOTAL_TURNS, help="turn limit")
     ap.add_argument("--timeout", type=float, default=0.5, help="per-turn timeout seconds per bot")
     ap.add_argument("--fps", type=int, default=30, help="fps cap when rendering")
+    ap.add_argument("--isolate-bots", action="store_true", help="run each bot in its own long-lived process, killed on timeout")
     args = ap.parse_args()
 
     g = Game(
@@ -286,10 +345,13 @@ def main():
         blue_bot_path=args.blue,
         map_path=args.map,
         replay_path=args.replay,
+        replay_format=args.replay_format,
         render=args.render,
         turn_limit=args.turns,
         per_turn_timeout_s=args.timeout,
         fps_cap=args.fps,
+        isolate_bots=args.isolate_bots,
+        render_process=args.render_process,
     )
     try:
         g.run_game()
@@ -108,4 +108,8 @@ class GameConstants(metaclass = FrozenMeta):
 
   #WARNING: this should be specified in the map, but if not, default are these:
   MIDGAME_SWITCH_TURN = 250
-  MIDGAME_SWITCH_DURATION = 100
\ No newline at end of file
+  MIDGAME_SWITCH_DURATION = 100
+
+
+#replay file formats (see replay.py), here so the CLI can list them without importing the writers
+REPLAY_FORMATS = ("json", "jsonl", "delta")
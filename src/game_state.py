@@ -4,13 +4,14 @@ Game state that keeps track of teams, bots, maps, team money, bot items, and ord
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 
 from game_constants import Team, TileType, FoodType, GameConstants
 from map import Map
 from tiles import Tile, Floor, Wall, Counter, Sink, SinkTable, Cooker, Trash, Submit, Shop, Box
 from item import Item, Food, Plate, Pan
+from slots import get_fields, set_fields, copy_fields
 
 
 # -----------------------
@@ -25,7 +26,7 @@ class GameStateException(Exception):
 # Orders
 # -----------------------
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     '''Order class that is based on order type in game constants'''
     order_id: int
@@ -38,12 +39,24 @@ class Order:
     completed_turn: Optional[int] = None
     penalized: bool = False 
 
+    #canonical plate signature that fills this order, computed once
+    signature: Tuple[Tuple[int, bool, int], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.signature = tuple(order_signature(self.required))
+
     def is_expired(self, turn: int) -> bool:
         return turn > self.expires_turn
 
     def is_active(self, turn: int) -> bool:
         return self.created_turn <= turn <= self.expires_turn and self.completed_turn is None
 
+    def clone(self) -> Order:
+        '''copy of the order status, the required list is shared'''
+        o = Order.__new__(Order)
+        copy_fields(self, o)
+        return o
+
 
 def plate_food_signature(plate: Plate) -> List[Tuple[int, bool, int]]:
     '''Helper that basically creates a unique signature for each user plated food'''
@@ -72,14 +85,14 @@ def order_signature(req: List[FoodType]) -> List[Tuple[int, bool, int]]:
 
 def plate_matches_order(plate: Plate, order: Order) -> bool:
     '''Sees if the plate matches the order'''
-    return plate_food_signature(plate) == order_signature(order.required)
+    return tuple(plate_food_signature(plate)) == order.signature
 
 
 # -----------------------
 # Bots
 # -----------------------
 
-@dataclass
+@dataclass(slots=True)
 class BotState:
     '''For each bot, they have their bot state to keep track of'''
     bot_id: int
@@ -94,6 +107,87 @@ class BotState:
         '''Helper that gets their position'''
         return (self.x, self.y)
 
+    def clone(self) -> BotState:
+        holding = self.holding.clone() if self.holding is not None else None
+        return BotState(self.bot_id, self.team, self.x, self.y, holding, self.map_team)
+
+
+# -----------------------
+# Undo journal entries
+# -----------------------
+
+#(kind, target, ...) tuples, see GameState.undo_to
+J_FIELDS = 0 #(J_FIELDS, obj, saved attribute dict)
+J_LIST = 1 #(J_LIST, list, saved copy)
+J_DICT = 2 #(J_DICT, dict, saved copy)
+J_CELL = 3 #(J_CELL, occupancy column, y, saved value)
+J_MARK = 4 #(J_MARK, state hash) placed by journal_mark
+J_TRUNC = 5 #(J_TRUNC, append-only list, saved length)
+J_KEY = 6 #(J_KEY, dict, key, saved value or _MISSING)
+
+_MISSING = object()
+
+
+#saved copy of an object's attributes for the journal, and putting it back (slots or __dict__)
+capture_fields = get_fields
+restore_fields = set_fields
+
+
+# -----------------------
+# Zobrist-style state hashing
+# -----------------------
+
+#the hash is the xor of one 64-bit key per component (bot, tile, team money).
+#keys come from mixing an int-only feature tuple, so there is no table to fill
+#and the same position hashes the same in every process.
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    '''splitmix64 finalizer, spreads a python hash over all 64 bits'''
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def item_features(it: Any) -> tuple:
+    '''everything about an item that can change during a game, as ints'''
+    if it is None:
+        return ()
+    if isinstance(it, Food):
+        return (1, it.food_id, it.chopped, it.cooked_stage)
+    if isinstance(it, Plate):
+        return (2, it.dirty, tuple(plate_food_signature(it)))
+    if isinstance(it, Pan):
+        return (3, item_features(it.food))
+    if isinstance(it, FoodType):
+        return (1, it.food_id, False, 0)
+    return (4,)
+
+
+def bot_key(bot: BotState) -> int:
+    return _mix64(hash((0, bot.bot_id, bot.map_team.value, bot.x, bot.y, item_features(bot.holding))))
+
+
+def tile_key(team: Team, x: int, y: int, tile: Tile) -> int:
+    features = (
+        1, team.value, x, y,
+        item_features(tile.item),
+        tile.using,
+        getattr(tile, "count", 0),
+        getattr(tile, "cook_progress", 0),
+        getattr(tile, "num_dirty_plates", 0),
+        getattr(tile, "curr_dirty_plate_progress", 0),
+        getattr(tile, "num_clean_plates", 0),
+    )
+    return _mix64(hash(features))
+
+
+def money_key(team: Team, amount: int) -> int:
+    return _mix64(hash((2, team.value, amount)))
+
 
 # -----------------------
 # Tile factory and map normalization
@@ -126,11 +220,13 @@ def normalize_map_tiles(m: Map) -> None:
     '''It converts map tiles from tile type to actual tiles that are interactable IF NEEDED (at the beginning especially)'''
     if m.tiles is None:
         m.tiles = [[tile_factory(TileType.FLOOR) for _ in range(m.height)] for _ in range(m.width)]
+        m.build_tile_index()
         return
 
     sample = m.tiles[0][0] #assume tiles is either all tile type or tiles
     if isinstance(sample, TileType):
         m.tiles = [[tile_factory(cell) for cell in col] for col in m.tiles]  # m.tiles is [x][y]
+        m.build_tile_index()
 
     #do nothing
     elif isinstance(sample, Tile):
@@ -157,9 +253,15 @@ class GameState:
         #shared team money
         self.team_money: Dict[Team, int] = {Team.RED: 150, Team.BLUE: 150}
         
-        #each team has its own independent order list
-        #this is filled in in game.py after processing the map
+        #each team has its own independent order list, the full history is kept for replays
+        #this is filled in in game.py after processing the map, always through add_orders()
         self.orders: Dict[Team, List[Order]] = {Team.RED: [], Team.BLUE: []}
+
+        #turn -> (team, index into orders[team]) of the orders that become expired on that turn
+        self.expiry_timeline: Dict[int, List[Tuple[Team, int]]] = {}
+
+        #order signature -> indexes into orders[team] of orders not yet completed or expired, oldest first
+        self.open_orders: Dict[Team, Dict[tuple, List[int]]] = {Team.RED: {}, Team.BLUE: {}}
         
         self.next_order_id = 1
 
@@ -178,6 +280,264 @@ class GameState:
             Team.BLUE: [[None for _ in range(self.blue_map.height)] for _ in range(self.blue_map.width)],
         }
 
+        #cookers and sinks that may need ticking, touch_tile() adds and tick_environment() drops idle ones
+        #(dicts used as insertion ordered sets so the journal can save them)
+        self.tick_candidates: Dict[Team, Dict[Tuple[int, int], None]] = {}
+        for team in (Team.RED, Team.BLUE):
+            m = self.get_map(team)
+            self.tick_candidates[team] = dict.fromkeys(m.tiles_of(TileType.COOKER.tile_name) + m.tiles_of(TileType.SINK.tile_name))
+
+        #undo journal for search, None unless start_journal() was called
+        self.journal: Optional[List[tuple]] = None
+
+        #bumped by every touch_* hook (so by every mutation), never goes back down; see RobotController observation cache
+        self.version = 0
+        #same idea, only for bot positions (set_occupancy), keys RobotController.find_path results
+        self.occupancy_version = 0
+        #same idea per team map, only for tile changes (touch_tile), keys the map an isolated bot keeps
+        self.map_version: Dict[Team, int] = {Team.RED: 0, Team.BLUE: 0}
+        #(team, x, y) of every tile touched since the log was last drained, None unless a renderer turned it on
+        #(see render.Renderer); clones, restore() and undo_to() leave it None, so the renderer scans again
+        self.tile_log: Optional[Dict[Tuple[Team, int, int], None]] = None
+
+        #zobrist hash, components touched since the last read are xored back in lazily
+        self.zobrist = 0
+        self.zobrist_pending: Dict[tuple, None] = {}
+        self.recompute_state_hash()
+
+
+    # -------------
+    # Forward simulation
+    # -------------
+
+    def clone(self) -> GameState:
+        '''
+        independent copy for search/rollouts, much cheaper than copy.deepcopy:
+        only mutable state (tiles and items, bots, occupancy, money, orders, switch flags) is copied,
+        order requirements and static map data are shared
+        '''
+        gs = GameState.__new__(GameState)
+        gs.__dict__.update(self.__dict__)
+
+        gs.red_map = self.red_map.clone()
+        gs.blue_map = self.blue_map.clone()
+        gs.bots = {bot_id: b.clone() for bot_id, b in self.bots.items()}
+        gs.team_money = dict(self.team_money)
+        gs.orders = {team: [o.clone() for o in orders] for team, orders in self.orders.items()}
+        gs.expiry_timeline = {turn: due[:] for turn, due in self.expiry_timeline.items()}
+        gs.open_orders = {team: {sig: idxs[:] for sig, idxs in by_sig.items()} for team, by_sig in self.open_orders.items()}
+        gs.switched = dict(self.switched)
+        gs.occupancy = {team: [col[:] for col in occ] for team, occ in self.occupancy.items()}
+        gs.zobrist_pending = dict(self.zobrist_pending)
+        gs.tick_candidates = {team: dict(c) for team, c in self.tick_candidates.items()}
+        gs.map_version = dict(self.map_version)
+        gs.tile_log = None
+        gs.journal = None
+        return gs
+
+    def snapshot(self) -> GameState:
+        '''saved copy of the current state, see restore()'''
+        return self.clone()
+
+    def restore(self, snapshot: GameState) -> None:
+        '''
+        rewinds this state in place to a snapshot(), so controllers holding this object keep working;
+        the snapshot itself is left untouched and can be restored again
+        '''
+        journaling = self.journal is not None
+        version = max(self.version, snapshot.version) + 1
+        occupancy_version = max(self.occupancy_version, snapshot.occupancy_version) + 1
+        map_version = {team: max(v, snapshot.map_version[team]) + 1 for team, v in self.map_version.items()}
+        self.__dict__.update(snapshot.clone().__dict__)
+        self.version = version
+        self.occupancy_version = occupancy_version
+        self.map_version = map_version
+
+        #older journal entries point at the replaced objects, start over
+        self.journal = [] if journaling else None
+
+    # -------------
+    # Undo journal (make/unmake for search)
+    # -------------
+
+    def start_journal(self) -> None:
+        '''record every mutation from now on so it can be undone with undo_to()'''
+        self.journal = []
+
+    def stop_journal(self) -> None:
+        self.journal = None
+
+    def journal_mark(self) -> int:
+        '''position to roll back to later'''
+        if self.journal is None:
+            raise GameStateException("journal_mark() needs start_journal() first")
+        self.journal.append((J_MARK, self.state_hash()))
+        return len(self.journal) - 1
+
+    def undo_to(self, mark: int) -> None:
+        '''undo every mutation recorded since journal_mark() returned mark, cost is proportional to the change'''
+        j = self.journal
+        if j is None or not 0 <= mark < len(j) or j[mark][0] != J_MARK:
+            raise GameStateException(f"invalid journal mark {mark}")
+
+        saved_hash = j[mark][1]
+        version = self.version + 1 #restored fields include an older version, move past everything seen instead
+        occupancy_version = self.occupancy_version + 1
+        while len(j) > mark:
+            entry = j.pop()
+            kind = entry[0]
+            if kind == J_FIELDS:
+                restore_fields(entry[1], entry[2])
+            elif kind == J_CELL:
+                entry[1][entry[2]] = entry[3]
+            elif kind == J_LIST:
+                entry[1][:] = entry[2]
+            elif kind == J_DICT:
+                entry[1].clear()
+                entry[1].update(entry[2])
+            elif kind == J_TRUNC:
+                del entry[1][entry[2]:]
+            elif kind == J_KEY:
+                if entry[3] is _MISSING:
+                    entry[1].pop(entry[2], None)
+                else:
+                    entry[1][entry[2]] = entry[3]
+
+        #the mark saved the hash of exactly this state
+        self.zobrist = saved_hash
+        self.zobrist_pending = {}
+        self.version = version
+        self.occupancy_version = occupancy_version
+        for team in self.map_version:
+            self.map_version[team] += 1
+        #tiles were put back without touch_tile
+        self.tile_log = None
+
+    # touch_* record the current value of something that is about to change.
+    # call them BEFORE mutating: they bump the version, take the old value out of the state hash,
+    # and save it in the journal when the journal is on.
+
+    def touch_fields(self, obj: Any) -> None:
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append((J_FIELDS, obj, capture_fields(obj)))
+
+    def touch_container(self, c: Any) -> None:
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append((J_DICT, c, dict(c)) if isinstance(c, dict) else (J_LIST, c, c[:]))
+
+    def touch_append(self, lst: List[Any]) -> None:
+        '''cheaper touch_container for a list that is only appended to'''
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append((J_TRUNC, lst, len(lst)))
+
+    def touch_key(self, d: Dict[Any, Any], key: Any) -> None:
+        '''cheaper touch_container when only one key of a dict changes'''
+        self.version += 1
+        if self.journal is not None:
+            self.journal.append((J_KEY, d, key, d.get(key, _MISSING)))
+
+    def touch_item(self, it: Optional[Item]) -> None:
+        '''item plus whatever it contains that can change (plate food list, food in a pan)'''
+        self.version += 1
+        if self.journal is None or it is None:
+            return
+        self.journal.append((J_FIELDS, it, capture_fields(it)))
+        if isinstance(it, Plate):
+            self.journal.append((J_LIST, it.food, it.food[:]))
+        elif isinstance(it, Pan) and it.food is not None:
+            self.journal.append((J_FIELDS, it.food, capture_fields(it.food)))
+
+    def touch_bot(self, bot: BotState) -> None:
+        self.version += 1
+        k = (0, bot.bot_id)
+        if k not in self.zobrist_pending:
+            self.zobrist ^= bot_key(bot)
+            self.zobrist_pending[k] = None
+        if self.journal is None:
+            return
+        self.journal.append((J_FIELDS, bot, capture_fields(bot)))
+        self.touch_item(bot.holding)
+
+    def touch_tile(self, team: Team, x: int, y: int) -> None:
+        self.version += 1
+        self.map_version[team] += 1
+        if self.tile_log is not None:
+            self.tile_log[(team, x, y)] = None
+        tile = self.get_map(team).tiles[x][y]
+        k = (1, team, x, y)
+        if k not in self.zobrist_pending:
+            self.zobrist ^= tile_key(team, x, y, tile)
+            self.zobrist_pending[k] = None
+        if isinstance(tile, (Cooker, Sink)):
+            candidates = self.tick_candidates[team]
+            if (x, y) not in candidates:
+                if self.journal is not None:
+                    self.journal.append((J_KEY, candidates, (x, y), _MISSING))
+                candidates[(x, y)] = None
+        if self.journal is None:
+            return
+        self.journal.append((J_FIELDS, tile, capture_fields(tile)))
+        self.touch_item(tile.item)
+
+    def touch_money(self, team: Team) -> None:
+        k = (2, team)
+        if k not in self.zobrist_pending:
+            self.zobrist ^= money_key(team, self.team_money.get(team, 0))
+            self.zobrist_pending[k] = None
+        self.touch_container(self.team_money)
+
+    def set_occupancy(self, team: Team, x: int, y: int, bot_id: Optional[int]) -> None:
+        self.version += 1
+        self.occupancy_version += 1
+        col = self.occupancy[team][x]
+        if self.journal is not None:
+            self.journal.append((J_CELL, col, y, col[y]))
+        col[y] = bot_id
+
+    # -------------
+    # State hash (transposition tables)
+    # -------------
+
+    def __component_key(self, k: tuple) -> int:
+        kind = k[0]
+        if kind == 0:
+            bot = self.bots.get(k[1])
+            return 0 if bot is None else bot_key(bot)
+        if kind == 1:
+            return tile_key(k[1], k[2], k[3], self.get_map(k[1]).tiles[k[2]][k[3]])
+        return money_key(k[1], self.team_money.get(k[1], 0))
+
+    def state_hash(self) -> int:
+        '''
+        64-bit hash of bot positions/holdings, tile items, cooker and sink progress and money;
+        kept up to date by the touch_* hooks, so equal positions reached by different moves hash the same
+        '''
+        if self.zobrist_pending:
+            h = self.zobrist
+            for k in self.zobrist_pending:
+                h ^= self.__component_key(k)
+            self.zobrist = h
+            self.zobrist_pending = {}
+        return self.zobrist
+
+    def recompute_state_hash(self) -> int:
+        '''full O(map) recompute, only needed after editing state without the touch_* hooks'''
+        h = 0
+        for team in (Team.RED, Team.BLUE):
+            m = self.get_map(team)
+            for x in range(m.width):
+                col = m.tiles[x]
+                for y in range(m.height):
+                    h ^= tile_key(team, x, y, col[y])
+            h ^= money_key(team, self.team_money.get(team, 0))
+        for bot in self.bots.values():
+            h ^= bot_key(bot)
+        self.zobrist = h
+        self.zobrist_pending = {}
+        return h
 
     # -------------
     # Map helpers
@@ -205,6 +565,7 @@ class GameState:
         return self.team_money.get(team, 0)
 
     def add_team_money(self, team: Team, delta: int) -> None:
+        self.touch_money(team)
         self.team_money[team] = self.team_money.get(team, 0) + delta
 
     # -------------
@@ -225,8 +586,10 @@ class GameState:
             bot_id = 0 if len(self.bots) == 0 else (max(self.bots.keys()) + 1)
 
         #start off at the beginning with current map team
+        self.touch_container(self.bots)
         self.bots[bot_id] = BotState(bot_id=bot_id, team=team, x=x, y=y, holding=None, map_team=team)
-        self.occupancy[team][x][y] = bot_id
+        self.set_occupancy(team, x, y, bot_id)
+        self.zobrist_pending[(0, bot_id)] = None #new component, nothing to take out
         return bot_id
 
     def get_bot(self, bot_id: int) -> BotState:
@@ -241,6 +604,7 @@ class GameState:
 
     def start_turn(self) -> None:
         '''Run this at the start of each turn for environmental and passive'''
+        self.touch_fields(self)
         self.turn += 1
         
         #passive money
@@ -270,41 +634,48 @@ class GameState:
                 continue
             t = m.tiles[nx][ny]
             if isinstance(t, SinkTable):
+                self.touch_tile(team, nx, ny)
                 t.num_clean_plates += 1
                 return
 
-        #if there is no sink table near us in the common cas , we put the clean plates in the first sink table we see location
-        for ix in range(m.width):
-            for iy in range(m.height):
-                t = m.tiles[ix][iy]
-                if isinstance(t, SinkTable):
-                    t.num_clean_plates += 1
-                    return
+        #if there is no sink table near us in the common case, we put the clean plates in the closest sink table
+        pos = m.nearest_tile(TileType.SINKTABLE.tile_name, x, y)
+        if pos is not None and isinstance(m.tiles[pos[0]][pos[1]], SinkTable):
+            self.touch_tile(team, pos[0], pos[1])
+            m.tiles[pos[0]][pos[1]].num_clean_plates += 1
 
     def tick_environment(self, team: Team) -> None:
         '''cooking ticks helper that basically cooks if pan is in the food or wash if the dishes are washing'''
         m = self.get_map(team)
 
-        for x in range(m.width):
-            for y in range(m.height):
-
-                #get the tile
-                tile = m.tiles[x][y]
-
-                #if the tile is a cooker, then we auto cook it through ticking
-                if isinstance(tile, Cooker):
-                    pan = tile.item
-                    if isinstance(pan, Pan) and isinstance(pan.food, Food):
-                        tile.cook_progress += 1
-                        if tile.cook_progress == GameConstants.COOK_PROGRESS and pan.food.cooked_stage == 0:
-                            pan.food.cooked_stage = 1
-                        elif tile.cook_progress >= GameConstants.BURN_PROGRESS:
-                            pan.food.cooked_stage = 2
-
-                #if the tile is a sink, then if we are washing, then we clean it
-                if isinstance(tile, Sink):
-
-                    if tile.using and tile.num_dirty_plates > 0:
+        #only cookers and sinks touched since they were last idle, not the whole grid
+        candidates = self.tick_candidates[team]
+        idle: List[Tuple[int, int]] = []
+
+        for (x, y) in list(candidates):
+
+            #get the tile
+            tile = m.tiles[x][y]
+
+            #if the tile is a cooker, then we auto cook it through ticking
+            if isinstance(tile, Cooker):
+                pan = tile.item
+                if isinstance(pan, Pan) and isinstance(pan.food, Food):
+                    self.touch_tile(team, x, y)
+                    tile.cook_progress += 1
+                    if tile.cook_progress == GameConstants.COOK_PROGRESS and pan.food.cooked_stage == 0:
+                        pan.food.cooked_stage = 1
+                    elif tile.cook_progress >= GameConstants.BURN_PROGRESS:
+                        pan.food.cooked_stage = 2
+                else:
+                    idle.append((x, y))
+
+            #if the tile is a sink, then if we are washing, then we clean it
+            elif isinstance(tile, Sink):
+                if tile.using:
+                    self.touch_tile(team, x, y)
+
+                    if tile.num_dirty_plates > 0:
                         tile.curr_dirty_plate_progress += 1
 
                         if tile.curr_dirty_plate_progress >= GameConstants.PLATE_WASH_PROGRESS:
@@ -315,33 +686,87 @@ class GameState:
                     # reset the tile each turn so the user needs ot keep washing
                     tile.using = False
 
+                #not using until wash_sink() touches it again
+                idle.append((x, y))
+
+            else:
+                idle.append((x, y))
+
+        if idle:
+            self.touch_container(candidates)
+            for pos in idle:
+                del candidates[pos]
+
     def expire_orders(self) -> None:
         '''
         If an order expires without being completed then penalize that TEAM.
         Keeps all orders in the history, only marks them as penalized.
+        Only the orders scheduled to expire this turn are looked at.
         '''
-        for team in [Team.RED, Team.BLUE]:
-            
-            # We iterate through the existing list without creating a filtered copy
-            for o in self.orders.get(team, []):
-
-                # Check if order is expired, not completed, and hasn't been penalized yet
-                if o.completed_turn is None and o.is_expired(self.turn):
-                    if not o.penalized:
-                        self.add_team_money(team, -o.penalty)
-                        o.penalized = True
-            
+        if self.turn not in self.expiry_timeline:
+            return
+
+        self.touch_key(self.expiry_timeline, self.turn)
+        for team, idx in self.expiry_timeline.pop(self.turn):
+            o = self.orders[team][idx]
+            self.__close_order(team, idx)
+
+            # Check if order is expired, not completed, and hasn't been penalized yet
+            if o.completed_turn is None and o.is_expired(self.turn):
+                if not o.penalized:
+                    self.touch_fields(o)
+                    self.add_team_money(team, -o.penalty)
+                    o.penalized = True
+
 
     # -------------
     # Orders
     # -------------
 
+    def add_orders(self, team: Team, orders: List[Order]) -> None:
+        '''append orders to a team's history and schedule when each one expires'''
+        history = self.orders[team]
+        by_sig = self.open_orders[team]
+        self.touch_append(history)
+        for o in orders:
+            history.append(o)
+
+            idxs = by_sig.get(o.signature)
+            if idxs is None:
+                self.touch_key(by_sig, o.signature)
+                idxs = by_sig[o.signature] = []
+            self.touch_append(idxs)
+            idxs.append(len(history) - 1)
+
+            #first turn where is_expired() holds, never a turn that has already been processed
+            due = max(o.expires_turn + 1, self.turn + 1)
+            bucket = self.expiry_timeline.get(due)
+            if bucket is None:
+                self.touch_key(self.expiry_timeline, due)
+                bucket = self.expiry_timeline[due] = []
+            self.touch_append(bucket)
+            bucket.append((team, len(history) - 1))
+
+    def __close_order(self, team: Team, idx: int) -> None:
+        '''drop a completed or expired order from open_orders'''
+        by_sig = self.open_orders[team]
+        sig = self.orders[team][idx].signature
+        idxs = by_sig.get(sig)
+        if idxs is None or idx not in idxs:
+            return
+        self.touch_container(idxs)
+        idxs.remove(idx)
+        if not idxs:
+            self.touch_key(by_sig, sig)
+            del by_sig[sig]
+
     def spawn_order(self, required: List[FoodType], delta_time: int = 20, reward: int = 5, penalty: int = 2) -> int:
         '''
         creates an order for both teams
         returns the shared order_id but for both teams
         '''
 
+        self.touch_fields(self)
         order_id = self.next_order_id
         self.next_order_id += 1
 
@@ -356,8 +781,8 @@ class GameState:
                 penalty=penalty,
             )
 
-        self.orders[Team.RED].append(make_order())
-        self.orders[Team.BLUE].append(make_order())
+        self.add_orders(Team.RED, [make_order()])
+        self.add_orders(Team.BLUE, [make_order()])
 
         return order_id
 
@@ -373,16 +798,15 @@ class GameState:
                 continue
             t = m.tiles[nx][ny]
             if isinstance(t, Sink):
+                self.touch_tile(team, nx, ny)
                 t.num_dirty_plates += 1
                 return
 
-        # the first sink anywhere
-        for ix in range(m.width):
-            for iy in range(m.height):
-                t = m.tiles[ix][iy]
-                if isinstance(t, Sink):
-                    t.num_dirty_plates += 1
-                    return
+        # the closest sink anywhere
+        pos = m.nearest_tile(TileType.SINK.tile_name, x, y)
+        if pos is not None and isinstance(m.tiles[pos[0]][pos[1]], Sink):
+            self.touch_tile(team, pos[0], pos[1])
+            m.tiles[pos[0]][pos[1]].num_dirty_plates += 1
 
     def submit_plate(self, bot_id: int, target_x: int, target_y: int) -> bool:
         '''logic to submit the plate, will go to MAP team not the team that submitted'''
@@ -396,8 +820,15 @@ class GameState:
             return False
 
         order_team = bot.map_team #MAP OWNER, not the submission team
-        for o in self.orders.get(order_team, []):
-            if o.is_active(self.turn) and plate_matches_order(bot.holding, o):
+        history = self.orders[order_team]
+
+        #only open orders with exactly this plate's signature, oldest first
+        candidates = self.open_orders[order_team].get(tuple(plate_food_signature(bot.holding)), ())
+        for idx in candidates:
+            o = history[idx]
+            if o.is_active(self.turn):
+                self.__close_order(order_team, idx)
+                self.touch_fields(o)
                 o.claimed_by = bot_id
                 o.completed_turn = self.turn
 
@@ -407,6 +838,7 @@ class GameState:
                 #dirty plate goes into sink on that map specifically
                 self.add_dirty_plate_to_sink_near(order_team, target_x, target_y)
 
+                self.touch_bot(bot)
                 bot.holding = None #lets go of jitem
                 return True
 
@@ -431,9 +863,10 @@ class GameState:
         if self.occupancy[bot.map_team][new_x][new_y] is not None:
             return False
 
-        self.occupancy[bot.map_team][bot.x][bot.y] = None
-        self.occupancy[bot.map_team][new_x][new_y] = bot_id
+        self.set_occupancy(bot.map_team, bot.x, bot.y, None)
+        self.set_occupancy(bot.map_team, new_x, new_y, bot_id)
 
+        self.touch_bot(bot)
         bot.x, bot.y = new_x, new_y
         return True
 
@@ -523,17 +956,19 @@ class GameState:
         bot_ids = [bid for bid, b in self.bots.items() if b.team == team]
         for bid in bot_ids:
             b = self.bots[bid]
-            self.occupancy[b.map_team][b.x][b.y] = None
+            self.set_occupancy(b.map_team, b.x, b.y, None)
 
         #place on destination map with no  collisions between ANY bots
         for bid in bot_ids:
             b = self.bots[bid]
             spawn_x, spawn_y = self.find_free_spawn_near(dest_map, b.x, b.y)
+            self.touch_bot(b)
             b.map_team = dest_map
             b.x, b.y = spawn_x, spawn_y
-            self.occupancy[dest_map][spawn_x][spawn_y] = bid
+            self.set_occupancy(dest_map, spawn_x, spawn_y, bid)
 
         #set state
+        self.touch_container(self.switched)
         self.switched[team] = True
         return True
 
@@ -548,16 +983,18 @@ class GameState:
         #clear current occupancy
         for bid in bot_ids:
             b = self.bots[bid]
-            self.occupancy[b.map_team][b.x][b.y] = None
+            self.set_occupancy(b.map_team, b.x, b.y, None)
 
         #respawn on home map
         for bid in bot_ids:
             b = self.bots[bid]
             spawn_x, spawn_y = self.find_free_spawn_near(team, b.x, b.y)
+            self.touch_bot(b)
             b.map_team = team
             b.x, b.y = spawn_x, spawn_y
-            self.occupancy[team][spawn_x][spawn_y] = bid
+            self.set_occupancy(team, spawn_x, spawn_y, bid)
 
+        self.touch_container(self.switched)
         self.switched[team] = False
 
 
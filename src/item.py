@@ -1,5 +1,6 @@
 '''item.py File that provides Enums for Food and Food Container Item classes.'''
 
+import copy
 from abc import ABC
 from enum import Enum, auto
 from typing import List, Optional, Any
@@ -7,6 +8,9 @@ from game_constants import FoodType
 
 class Item(ABC):
     '''Generic Item Class'''
+    #no per-instance __dict__ for items, subclasses list their own slots
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -14,8 +18,14 @@ class Item(ABC):
         '''dictionary serialization for purposes of JSON'''
         return {"type": type(self).__name__}
 
+    def clone(self) -> "Item":
+        '''independent copy, much cheaper than copy.deepcopy'''
+        return copy.copy(self)
+
 
 class Food(Item):
+    __slots__ = ("food_name", "food_id", "can_chop", "can_cook", "buy_cost", "chopped", "cooked_stage")
+
     def __init__(self, food_type: FoodType):
         self.food_name = food_type.food_name
         self.food_id = food_type.food_id
@@ -26,6 +36,17 @@ class Food(Item):
         self.chopped = False
         self.cooked_stage = 0 #0 is raw, 1 is cooked, 2 is burnt
 
+    def clone(self) -> "Food":
+        f = Food.__new__(Food)
+        f.food_name = self.food_name
+        f.food_id = self.food_id
+        f.can_chop = self.can_chop
+        f.can_cook = self.can_cook
+        f.buy_cost = self.buy_cost
+        f.chopped = self.chopped
+        f.cooked_stage = self.cooked_stage
+        return f
+
     def to_dict(self):
         return {
             "type": "Food",
@@ -36,10 +57,15 @@ class Food(Item):
         }
 
 class Plate(Item):
+    __slots__ = ("food", "dirty")
+
     def __init__(self, food: List[Item] = [], dirty: bool = False):
         self.food = food if food is not None else [] #what food is on the plate, can have multiple foods on the plate
         self.dirty = dirty #if the plate is dirty, no food should be on it
 
+    def clone(self) -> "Plate":
+        return Plate([f.clone() if isinstance(f, Item) else f for f in self.food], self.dirty)
+
     def to_dict(self):
         return {
             "type": "Plate",
@@ -49,9 +75,14 @@ class Plate(Item):
         }
 
 class Pan(Item):
+    __slots__ = ("food",)
+
     def __init__(self, food: Optional[Food] = None):
         self.food = food #what food is on the pan, only 1 food at at a time on the pan
 
+    def clone(self) -> "Pan":
+        return Pan(self.food.clone() if self.food is not None else None)
+
     def to_dict(self):
         return {
             "type": "Pan",
@@ -2,7 +2,20 @@
 
 from game_constants import TileType, Team
 from tiles import Tile
-from typing import List, Tuple
+from distances import DistanceMatrix
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+#TileType flags by tile_id, so whole grids of ids turn into masks with one lookup
+_WALKABLE_BY_ID = np.zeros(256, dtype=bool)
+_PLACEABLE_BY_ID = np.zeros(256, dtype=bool)
+_INTERACTABLE_BY_ID = np.zeros(256, dtype=bool)
+for _tt in TileType:
+    _WALKABLE_BY_ID[_tt.tile_id] = _tt.is_walkable
+    _PLACEABLE_BY_ID[_tt.tile_id] = _tt.is_placeable
+    _INTERACTABLE_BY_ID[_tt.tile_id] = _tt.is_interactable
 
 class Map:
     '''
@@ -31,6 +44,10 @@ class Map:
 
                    x == width -->
     '''
+
+    #methods that only fill lazy caches, views.ObjectView lets bots call them on the real map
+    VIEW_SAFE_METHODS = ("nearest_tile", "get_distances")
+
     def __init__(self, width: int=32, height: int=32, tiles: List[List[Tile]]=None, team: Team=Team.RED, orders: List = None):
         self.width = width
         self.height = height
@@ -44,6 +61,105 @@ class Map:
         if self.orders is None:
             self.orders = []
 
+        self.build_tile_index()
+
+    def build_tile_index(self) -> None:
+        '''
+        positions of every tile grouped by tile_name, in x then y order;
+        tiles never change kind during a game, so this only needs redoing when self.tiles is replaced
+        '''
+        index: Dict[str, List[Tuple[int, int]]] = {}
+        for x, col in enumerate(self.tiles):
+            for y, t in enumerate(col):
+                index.setdefault(t.tile_name, []).append((x, y))
+        self.tile_index = index
+
+        #[x][y] arrays for whole-grid queries, same indexing as self.tiles; set_tile() keeps them in sync
+        self.tile_ids = np.array(
+            [[t.tile_id for t in col] for col in self.tiles], dtype=np.uint8
+        ).reshape(self.width, self.height)
+        self.walkable = _WALKABLE_BY_ID[self.tile_ids]
+        self.placeable = _PLACEABLE_BY_ID[self.tile_ids]
+        self.interactable = _INTERACTABLE_BY_ID[self.tile_ids]
+
+        #tile_name -> [x][y] nearest tile of that kind, filled in lazily by nearest_tile()
+        self.nearest_index: Dict[str, List[List[Optional[Tuple[int, int]]]]] = {}
+
+        #walking distances, map_processor fills this in at load, otherwise get_distances() does
+        self.distances: Optional[DistanceMatrix] = None
+
+    def set_tile(self, x: int, y: int, tile: Tile) -> None:
+        '''
+        replace the tile at (x, y) and update the tile index, grids and lookup caches to match;
+        for building or editing maps, the engine never swaps tiles during a game
+        '''
+        old = self.tiles[x][y]
+        self.tiles[x][y] = tile
+
+        #clones share these with the original, so write to copies
+        index = dict(self.tile_index)
+        rest = [p for p in index.get(old.tile_name, []) if p != (x, y)]
+        if rest:
+            index[old.tile_name] = rest
+        else:
+            index.pop(old.tile_name, None)
+        index[tile.tile_name] = sorted(index.get(tile.tile_name, []) + [(x, y)])
+        self.tile_index = index
+
+        self.tile_ids = self.tile_ids.copy()
+        self.tile_ids[x, y] = tile.tile_id
+        walkable_changed = bool(self.walkable[x, y]) != bool(_WALKABLE_BY_ID[tile.tile_id])
+        for name, table in (("walkable", _WALKABLE_BY_ID), ("placeable", _PLACEABLE_BY_ID), ("interactable", _INTERACTABLE_BY_ID)):
+            grid = getattr(self, name).copy()
+            grid[x, y] = table[tile.tile_id]
+            setattr(self, name, grid)
+
+        self.nearest_index = {k: v for k, v in self.nearest_index.items() if k not in (old.tile_name, tile.tile_name)}
+        if walkable_changed:
+            self.distances = None
+
+    def get_distances(self) -> DistanceMatrix:
+        '''walking distances between walkable cells (8 directions, bots ignored), each source's row is built on first use'''
+        if self.distances is None:
+            self.distances = DistanceMatrix.from_map(self)
+        return self.distances
+
+    def tiles_of(self, tile_name: str) -> List[Tuple[int, int]]:
+        '''(x, y) of every tile with this tile_name, eg "COOKER"'''
+        return self.tile_index.get(tile_name, [])
+
+    def nearest_tile(self, tile_name: str, x: int, y: int) -> Optional[Tuple[int, int]]:
+        '''
+        closest tile with this tile_name to (x, y) by Chebyshev distance (ignores walls), None if there is none;
+        the first call per tile_name builds a table in O(width * height), after that lookups are O(1)
+        '''
+        if not self.in_bounds(x, y) or tile_name not in self.tile_index:
+            return None
+        table = self.nearest_index.get(tile_name)
+        if table is None:
+            table = self.__build_nearest_table(self.tile_index[tile_name])
+            self.nearest_index[tile_name] = table
+        return table[x][y]
+
+    def __build_nearest_table(self, sources: List[Tuple[int, int]]) -> List[List[Optional[Tuple[int, int]]]]:
+        '''multi-source bfs with 8 neighbours, every cell is claimed by the source that reaches it first'''
+        table: List[List[Optional[Tuple[int, int]]]] = [[None] * self.height for _ in range(self.width)]
+        queue = deque()
+        for (sx, sy) in sources:
+            table[sx][sy] = (sx, sy)
+            queue.append((sx, sy))
+
+        while queue:
+            cx, cy = queue.popleft()
+            owner = table[cx][cy]
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx, ny = cx + dx, cy + dy
+                    if 0 <= nx < self.width and 0 <= ny < self.height and table[nx][ny] is None:
+                        table[nx][ny] = owner
+                        queue.append((nx, ny))
+        return table
+
 
     
     def in_bounds(self, x: int, y: int) -> bool:
@@ -89,6 +205,13 @@ class Map:
         
         return self.tiles[x][y].is_interactable
     
+    def clone(self) -> "Map":
+        '''copy with independent tiles, everything else on the map is shared'''
+        m = Map.__new__(Map)
+        m.__dict__.update(self.__dict__)
+        m.tiles = [[t.clone() for t in col] for col in self.tiles]
+        return m
+
     def to_2d_list(self):
         '''
         converts the map into a 2D list of tile dictionaries containing full state
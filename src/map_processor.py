@@ -1,13 +1,17 @@
 # map_processor.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 
-import copy
+import hashlib
+import os
+import pickle
+import tempfile
 
 from game_constants import Team, FoodType, GameConstants
 from map import Map
+from distances import DistanceMatrix
 from tiles import Tile, Floor, Wall, Counter, Sink, SinkTable, Cooker, Trash, Submit, Shop, Box
 from game_state import Order
 
@@ -42,6 +46,10 @@ class ParsedMap:
     switch_turn: int
     switch_duration: int
 
+    #map rows as in the file (top row first) and the legend they were read with, build_team_map() instantiates from these
+    layout: List[str] = field(default_factory=list)
+    legend: Dict[str, type] = field(default_factory=lambda: CHAR_TO_TILE)
+
 
 def parse_switch_line(line: str, default_turn: int, default_duration: int) -> Tuple[int, int]:
     '''
@@ -88,8 +96,31 @@ def extract_optional_switch_config(lines: List[str]) -> Tuple[List[str], int, in
     return kept, switch_turn, switch_duration
 
 
-def clone_tiles_grid(tiles: List[List[Tile]]) -> List[List[Tile]]:
-    return copy.deepcopy(tiles)
+def tiles_from_layout(layout_lines: List[str], legend: Dict[str, type], path: str = '<layout>') -> Tuple[List[List[Tile]], List[Tuple[int, int]]]:
+    '''
+    new [x][y] tile grid for the layout rows (top row first) and the bot spawn cells;
+    every call makes fresh tiles, so each team map gets its own grid without copying another
+    '''
+    width = len(layout_lines[0])
+    height = len(layout_lines)
+
+    tiles: List[List[Tile]] = [[None] * height for _ in range(width)]  # type: ignore
+    spawns: List[Tuple[int, int]] = []
+
+    for file_row, row in enumerate(layout_lines):
+        y = height - 1 - file_row
+        for x, ch in enumerate(row):
+            if ch in BOT_SPAWN_CHARS:
+                spawns.append((x, y))
+                tiles[x][y] = Floor()
+                continue
+
+            tile_cls = legend.get(ch)
+            if tile_cls is None:
+                raise ValueError(f'{path}: unknown tile char "{ch}" at (x={x}, file_row={file_row})')
+            tiles[x][y] = tile_cls()
+
+    return tiles, spawns
 
 
 def read_nonempty_noncomment_lines(raw_lines: List[str]) -> List[str]:
@@ -222,23 +253,9 @@ def load_map_from_txt(
 
     height = len(layout_lines)
 
-    tiles: List[List[Tile]] = [[Floor() for _ in range(height)] for _ in range(width)]
-    spawns_red: List[Tuple[int, int]] = []
-    spawns_blue: List[Tuple[int, int]] = []
-
-    for file_row, row in enumerate(layout_lines):
-        y = height - 1 - file_row
-        for x, ch in enumerate(row):
-            if ch in BOT_SPAWN_CHARS:
-                spawns_red.append((x, y))
-                spawns_blue.append((x, y))
-                tiles[x][y] = Floor()
-                continue
-
-            tile_cls = legend.get(ch)
-            if tile_cls is None:
-                raise ValueError(f'{path}: unknown tile char "{ch}" at (x={x}, file_row={file_row})')
-            tiles[x][y] = tile_cls()
+    tiles, spawns = tiles_from_layout(layout_lines, legend, path)
+    spawns_red: List[Tuple[int, int]] = spawns
+    spawns_blue: List[Tuple[int, int]] = list(spawns)
 
     #parsing then clone the orders later for both maps
     orders: List[Order] = []
@@ -254,7 +271,101 @@ def load_map_from_txt(
             orders.append(parsed)
 
     m = Map(width=width, height=height, tiles=tiles, team=team, orders=[])  # Map.orders is unused in your GameState
-    return ParsedMap(map_obj=m, spawns_red=spawns_red, spawns_blue=spawns_blue, orders=orders, switch_turn=switch_turn, switch_duration=switch_duration)
+    #only the neighbour table, rows of distances are built when bots first ask for them
+    m.distances = DistanceMatrix.from_map(m)
+    return ParsedMap(
+        map_obj=m, spawns_red=spawns_red, spawns_blue=spawns_blue, orders=orders,
+        switch_turn=switch_turn, switch_duration=switch_duration, layout=layout_lines, legend=legend,
+    )
+
+
+def build_team_map(parsed: ParsedMap, team: Team) -> Map:
+    '''
+    another map for the parsed layout with fresh tiles (eg the blue map, or the copy a bot gets at init),
+    built from the layout instead of deep-copying parsed.map_obj; the distance matrix is shared, it never changes
+    '''
+    src = parsed.map_obj
+    tiles, _ = tiles_from_layout(parsed.layout, parsed.legend)
+    m = Map(width=src.width, height=src.height, tiles=tiles, team=team, orders=[])
+    m.distances = src.distances
+    return m
+
+
+# ----------------------------
+# Parsed map cache
+# ----------------------------
+
+#directory for cached maps, or "off" to always parse; default is $XDG_CACHE_HOME/awap-engine/maps
+MAP_CACHE_ENV = "AWAP_MAP_CACHE"
+
+#modules whose classes are pickled into the cache, changing any of them invalidates every entry
+CACHE_SOURCES = ("map_processor.py", "map.py", "tiles.py", "item.py", "game_state.py", "game_constants.py", "distances.py", "slots.py")
+
+_engine_fingerprint: Optional[str] = None
+
+
+def map_cache_dir() -> Optional[str]:
+    '''where parsed maps are cached, None if caching is turned off'''
+    override = os.environ.get(MAP_CACHE_ENV)
+    if override is not None:
+        return None if override.strip().lower() in ("", "0", "off", "false", "no") else override
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "awap-engine", "maps")
+
+
+def engine_fingerprint() -> str:
+    '''hash of the engine sources in CACHE_SOURCES (computed once per process)'''
+    global _engine_fingerprint
+    if _engine_fingerprint is None:
+        h = hashlib.sha256()
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in CACHE_SOURCES:
+            h.update(name.encode())
+            with open(os.path.join(src_dir, name), 'rb') as f:
+                h.update(f.read())
+        _engine_fingerprint = h.hexdigest()
+    return _engine_fingerprint
+
+
+def load_map_cached(path: str, *, default_reward: int = 5, default_penalty: int = 2) -> ParsedMap:
+    '''
+    load_map_from_txt() for the red map, served from a pickle of an earlier parse of the same file contents
+    when there is one: tiles, orders, tile index and distance matrix come back ready to use.
+    any cache problem (unwritable dir, stale or broken entry) just falls back to parsing
+    '''
+    cache_dir = map_cache_dir()
+    if cache_dir is None:
+        return load_map_from_txt(path, default_reward=default_reward, default_penalty=default_penalty)
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    key = hashlib.sha256(content)
+    key.update(f'|{engine_fingerprint()}|{default_reward}|{default_penalty}|{pickle.HIGHEST_PROTOCOL}'.encode())
+    entry = os.path.join(cache_dir, key.hexdigest() + '.pickle')
+
+    try:
+        with open(entry, 'rb') as f:
+            parsed = pickle.load(f)
+        if isinstance(parsed, ParsedMap):
+            return parsed
+    except Exception:
+        pass
+
+    parsed = load_map_from_txt(path, default_reward=default_reward, default_penalty=default_penalty)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        #write then rename, so concurrent games never read a half-written entry
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except Exception:
+        pass
+    return parsed
 
 
 def load_two_team_maps_and_orders(path: str, default_reward: int = 5, default_penalty: int = 2) -> Tuple[Map, Map, List[Order], List[Order], ParsedMap]:
@@ -264,23 +375,17 @@ def load_two_team_maps_and_orders(path: str, default_reward: int = 5, default_pe
 
     different map, orders objects
     '''
-    parsed = load_map_from_txt(
+    parsed = load_map_cached(
         path,
-        team=Team.RED,
         default_reward=default_reward,
         default_penalty=default_penalty,
     )
 
     map_red = parsed.map_obj
-    map_blue = Map(
-        width=map_red.width,
-        height=map_red.height,
-        tiles=clone_tiles_grid(map_red.tiles),
-        team=Team.BLUE,
-        orders=[],
-    )
+    map_blue = build_team_map(parsed, Team.BLUE)
 
+    #order status is per team, the required lists and signatures are shared
     orders_red = parsed.orders
-    orders_blue = copy.deepcopy(parsed.orders)
+    orders_blue = [o.clone() for o in parsed.orders]
 
     return map_red, map_blue, orders_red, orders_blue, parsed
@@ -2,9 +2,11 @@
 import os
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Dict, Tuple, Optional, List
 
+import numpy as np
 import pygame
 
 from game_constants import Team
@@ -24,6 +26,9 @@ class RenderConfig:
     hud_height: int = 220         # bottom HUD
     margin: int = 12
     grid_line: int = 1
+    font_size: int = 16
+    font_size_small: int = 14
+    text_cache_size: int = 1024   # rendered text surfaces kept, least recently used are dropped
 
 
 TILE_COLORS: Dict[str, Tuple[int, int, int]] = {
@@ -46,6 +51,7 @@ TEAM_COLOR = {
 
 TEXT_COLOR = (15, 15, 15)
 HUD_BG = (250, 250, 250)
+BG_COLOR = (245, 245, 245)
 GRID_COLOR = (200, 200, 200)
 ITEM_TEXT_COLOR = (20, 20, 20)
 
@@ -71,10 +77,20 @@ def _item_label(it) -> str:
     return type(it).__name__[:6]
 
 
-def _order_label(o: Order, turn: int) -> str:
+def _tile_label(t) -> str:
+    '''what a tile shows: its item, and the stock left on a box'''
+    it = getattr(t, "item", None)
+    if isinstance(t, Box) and getattr(t, "count", 0) > 0:
+        label = _item_label(it)
+        return f"{label}x{t.count}" if label else f"x{t.count}"
+    return _item_label(it)
+
+
+def _order_label_parts(o: Order, turn: int) -> Tuple[str, ...]:
+    '''order line in pieces: only rem= changes every turn, the rest stays in the text cache'''
     req = ",".join([ft.food_name for ft in o.required])
     remaining = o.expires_turn - turn
-    return f"#{o.order_id} [{req}]  t={o.created_turn}->{o.expires_turn}  rem={remaining}  R={o.reward} P={o.penalty}"
+    return (f"#{o.order_id} [{req}]  t={o.created_turn}->{o.expires_turn}  ", f"rem={remaining}", f"  R={o.reward} P={o.penalty}")
 
 
 class Renderer:
@@ -96,12 +112,23 @@ class Renderer:
         self._font = None
         self._font_small = None
 
+        #(text, font size, color) -> rendered surface, least recently used first; see _text_surface
+        self._text_cache: "OrderedDict[Tuple[str, int, Tuple[int, int, int]], pygame.Surface]" = OrderedDict()
+
+        #team -> (tile_ids grid it was drawn from, surface), see _static_layer
+        self._static: Dict[Team, Tuple[object, pygame.Surface]] = {}
+        #team -> {(x, y): (content, screen extent)} as drawn last frame, see _draw_map
+        self._drawn: Dict[Team, Dict[Tuple[int, int], Tuple[object, pygame.Rect]]] = {}
+        self._needs_full_redraw = True
+        #team -> {(x, y): item label} for every tile that shows one, see _sync_labels
+        self._labels: Dict[Team, Dict[Tuple[int, int], str]] = {}
+
     def init(self):
         pygame.init()
         pygame.display.set_caption("Competitive Cooking Game")
         self.screen = pygame.display.set_mode((self.win_w, self.win_h))
-        self._font = pygame.font.SysFont("Arial", 16)
-        self._font_small = pygame.font.SysFont("Arial", 14)
+        self._font = pygame.font.SysFont("Arial", self.cfg.font_size)
+        self._font_small = pygame.font.SysFont("Arial", self.cfg.font_size_small)
         self.clock = pygame.time.Clock()
         self._inited = True
 
@@ -112,82 +139,192 @@ class Renderer:
         py = self.cfg.margin + (self.h - 1 - y) * ts
         return pygame.Rect(px, py, ts, ts)
 
-    def _draw_text(self, text: str, x: int, y: int, *, small: bool = False, color=TEXT_COLOR):
-        font = self._font_small if small else self._font
-        surf = font.render(text, True, color)
+    def _draw_text(self, text: str, x: int, y: int, *, small: bool = False, color=TEXT_COLOR) -> int:
+        '''draws text with its top left at (x, y), returns its width'''
+        surf = self._text_surface(text, small, color)
         self.screen.blit(surf, (x, y))
+        return surf.get_width()
+
+    def _draw_text_parts(self, parts, x: int, y: int, *, small: bool = False, color=TEXT_COLOR):
+        '''pieces of one line side by side, so the pieces that don't change are cached on their own'''
+        for part in parts:
+            x += self._draw_text(part, x, y, small=small, color=color)
+
+    def _text_surface(self, text: str, small: bool, color) -> pygame.Surface:
+        '''rendered text from the LRU cache, font.render only on a miss'''
+        key = (text, self.cfg.font_size_small if small else self.cfg.font_size, tuple(color))
+        cache = self._text_cache
+        surf = cache.get(key)
+        if surf is not None:
+            cache.move_to_end(key)
+            return surf
 
-    def _draw_map(self, team: Team, map_left: int):
+        font = self._font_small if small else self._font
+        surf = font.render(text, True, color)
+        cache[key] = surf
+        if len(cache) > self.cfg.text_cache_size:
+            cache.popitem(last=False)
+        return surf
+
+    def _static_layer(self, team: Team) -> pygame.Surface:
+        '''
+        tiles and grid of one map, drawn once into an off-screen surface; the layout never changes in a game,
+        so it is only redrawn when the map's tile ids do (new grid objects with the same ids, eg from
+        GameState.restore or a snapshot sent to a render process, reuse the layer)
+        '''
         m = self.gs.get_map(team)
+        cached = self._static.get(team)
+        if cached is not None and (cached[0] is m.tile_ids or np.array_equal(cached[0], m.tile_ids)):
+            self._static[team] = (m.tile_ids, cached[1])
+            return cached[1]
+
+        ts = self.cfg.tile_size
+        gl = self.cfg.grid_line
+        surf = pygame.Surface((self.map_px_w + gl, self.map_px_h + gl))
+        surf.fill(BG_COLOR)
 
-        # tiles
         for x in range(m.width):
             for y in range(m.height):
                 t = m.tiles[x][y]
-                rect = self._tile_rect(map_left, x, y)
+                rect = pygame.Rect(x * ts, (self.h - 1 - y) * ts, ts, ts)
                 col = TILE_COLORS.get(getattr(t, "tile_name", "FLOOR"), (220, 220, 220))
-                pygame.draw.rect(self.screen, col, rect)
+                pygame.draw.rect(surf, col, rect)
 
-        # grid
-        if self.cfg.grid_line > 0:
+        if gl > 0:
             for x in range(m.width + 1):
-                px = map_left + x * self.cfg.tile_size
-                pygame.draw.line(
-                    self.screen, GRID_COLOR,
-                    (px, self.cfg.margin),
-                    (px, self.cfg.margin + self.map_px_h),
-                    self.cfg.grid_line
-                )
+                pygame.draw.line(surf, GRID_COLOR, (x * ts, 0), (x * ts, self.map_px_h), gl)
             for y in range(m.height + 1):
-                py = self.cfg.margin + y * self.cfg.tile_size
-                pygame.draw.line(
-                    self.screen, GRID_COLOR,
-                    (map_left, py),
-                    (map_left + self.map_px_w, py),
-                    self.cfg.grid_line
-                )
-
-        #items (and box counts)
-        for x in range(m.width):
-            for y in range(m.height):
-                t = m.tiles[x][y]
-
-                if isinstance(t, Box) and getattr(t, "count", 0) > 0:
-                    label = _item_label(getattr(t, "item", None))
-                    label = f"{label}x{t.count}" if label else f"x{t.count}"
-                    rect = self._tile_rect(map_left, x, y)
-                    self._draw_text(label, rect.x + 3, rect.y + 3, small=True, color=ITEM_TEXT_COLOR)
-                    continue
-
-                it = getattr(t, "item", None)
-                if it is None:
-                    continue
-                label = _item_label(it)
-                if not label:
-                    continue
-                rect = self._tile_rect(map_left, x, y)
-                self._draw_text(label, rect.x + 3, rect.y + 3, small=True, color=ITEM_TEXT_COLOR)
-
-
-        # bots on this team map
+                pygame.draw.line(surf, GRID_COLOR, (0, y * ts), (self.map_px_w, y * ts), gl)
+
+        self._static[team] = (m.tile_ids, surf)
+        self._needs_full_redraw = True
+        return surf
+
+    def _sync_labels(self):
+        '''
+        bring the item labels up to date: the grids are scanned once, after that only the cells
+        GameState.touch_tile logged since the last frame are looked at again. A state without a log
+        (a fresh clone, or one that was restored or undone) is scanned in full and gets a log from then on
+        '''
+        gs = self.gs
+        log = gs.tile_log
+        if log is None or not self._labels:
+            for team in (Team.RED, Team.BLUE):
+                m = gs.get_map(team)
+                labels: Dict[Tuple[int, int], str] = {}
+                for x in range(m.width):
+                    col = m.tiles[x]
+                    for y in range(m.height):
+                        label = _tile_label(col[y])
+                        if label:
+                            labels[(x, y)] = label
+                self._labels[team] = labels
+            gs.tile_log = {}
+            return
+
+        for team, x, y in log:
+            labels = self._labels[team]
+            label = _tile_label(gs.get_map(team).tiles[x][y])
+            if label:
+                labels[(x, y)] = label
+            else:
+                labels.pop((x, y), None)
+        log.clear()
+
+    def _cell_contents(self, team: Team) -> Dict[Tuple[int, int], Tuple[str, Tuple[Tuple[int, Team], ...]]]:
+        '''(x, y) -> (item label, bots standing there) for every cell that shows something on this map'''
+        labels = self._labels[team]
+
+        bots: Dict[Tuple[int, int], List[Tuple[int, Team]]] = {}
         for bot_id, b in self.gs.bots.items():
             if getattr(b, "map_team", b.team) != team:
                 continue
-            rect = self._tile_rect(map_left, b.x, b.y)
+            bots.setdefault((b.x, b.y), []).append((bot_id, b.team))
+
+        contents = {pos: (label, ()) for pos, label in labels.items()}
+        for pos, here in bots.items():
+            contents[pos] = (labels.get(pos, ""), tuple(here))
+        return contents
+
+    def _cell_extent(self, map_left: int, x: int, y: int, content) -> pygame.Rect:
+        '''screen area a cell's drawing covers, item labels can run past the tile'''
+        rect = self._tile_rect(map_left, x, y)
+        label = content[0]
+        if label:
+            w, h = self._font_small.size(label)
+            rect = rect.union(pygame.Rect(rect.x + 3, rect.y + 3, w, h))
+        return rect
+
+    def _draw_cell(self, map_left: int, x: int, y: int, content, *, bots: bool):
+        rect = self._tile_rect(map_left, x, y)
+        label, here = content
+        if not bots:
+            if label:
+                self._draw_text(label, rect.x + 3, rect.y + 3, small=True, color=ITEM_TEXT_COLOR)
+            return
+        for bot_id, team in here:
             cx = rect.x + rect.w // 2
             cy = rect.y + rect.h // 2
-            pygame.draw.circle(self.screen, TEAM_COLOR[b.team], (cx, cy), rect.w // 3)
+            pygame.draw.circle(self.screen, TEAM_COLOR[team], (cx, cy), rect.w // 3)
             self._draw_text(str(bot_id), rect.x + 2, rect.y + rect.h - 16, small=True, color=(255, 255, 255))
 
-
-    def _draw_hud(self):
+    def _draw_map(self, team: Team, map_left: int) -> List[pygame.Rect]:
+        '''
+        bring one map on screen up to date and return the screen rects that changed:
+        only cells whose items or bots differ from the last frame are restored from the static layer and redrawn
+        '''
+        static = self._static_layer(team)
+        origin = (map_left, self.cfg.margin)
+        if self._needs_full_redraw:
+            self.screen.blit(static, origin)
+            self._drawn[team] = {}
+
+        prev = self._drawn.get(team, {})
+        curr = self._cell_contents(team)
+        changed = [pos for pos in prev.keys() | curr.keys() if prev.get(pos, (None,))[0] != curr.get(pos)]
+        if not changed:
+            return []
+
+        #labels at the right edge are cut at the map border, so every area can be restored from this map's layer
+        bounds = static.get_rect(topleft=origin)
+        #cells drawn the same as last frame keep their extent, only changed ones are measured again
+        extents = {
+            pos: prev[pos][1] if pos in prev and prev[pos][0] == c else self._cell_extent(map_left, pos[0], pos[1], c).clip(bounds)
+            for pos, c in curr.items()
+        }
+        dirty: List[pygame.Rect] = []
+        for pos in changed:
+            if pos in prev:
+                dirty.append(prev[pos][1])
+            if pos in extents:
+                dirty.append(extents[pos])
+
+        #items first, then bots on top, like a full redraw; clipping keeps untouched pixels as they are
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.blit(static, area.topleft, area.move(-origin[0], -origin[1]))
+            touching = [pos for pos, ext in extents.items() if ext.colliderect(area)]
+            for pos in touching:
+                self._draw_cell(map_left, pos[0], pos[1], curr[pos], bots=False)
+            for pos in touching:
+                self._draw_cell(map_left, pos[0], pos[1], curr[pos], bots=True)
+        self.screen.set_clip(None)
+
+        self._drawn[team] = {pos: (c, extents[pos]) for pos, c in curr.items()}
+        return dirty
+
+    def _draw_hud(self) -> pygame.Rect:
+        '''redrawn every frame (the turn counter always changes), returns its rect'''
         cfg = self.cfg
         hud_top = cfg.margin + self.map_px_h + cfg.margin
         hud_rect = pygame.Rect(cfg.margin, hud_top, self.win_w - 2 * cfg.margin, cfg.hud_height)
+        #long order lines run into the margin, so clear the full width below the maps
+        area = pygame.Rect(0, hud_top, self.win_w, self.win_h - hud_top)
+        self.screen.fill(BG_COLOR, area)
         pygame.draw.rect(self.screen, HUD_BG, hud_rect)
 
         # header
-        self._draw_text(f"Turn: {self.gs.turn}", cfg.margin + 8, hud_top + 8)
+        self._draw_text_parts(("Turn: ", str(self.gs.turn)), cfg.margin + 8, hud_top + 8)
         self._draw_text(f"Red money: {self.gs.get_team_money(Team.RED)}", cfg.margin + 140, hud_top + 8, color=TEAM_COLOR[Team.RED])
         self._draw_text(f"Blue money: {self.gs.get_team_money(Team.BLUE)}", cfg.margin + 300, hud_top + 8, color=TEAM_COLOR[Team.BLUE])
 
@@ -211,12 +348,12 @@ class Renderer:
 
         yy = y0 + 20
         for o in ro[:6]:
-            self._draw_text(_order_label(o, self.gs.turn), left_x, yy, small=True)
+            self._draw_text_parts(_order_label_parts(o, self.gs.turn), left_x, yy, small=True)
             yy += 18
 
         yy = y0 + 20
         for o in bo[:6]:
-            self._draw_text(_order_label(o, self.gs.turn), right_x, yy, small=True)
+            self._draw_text_parts(_order_label_parts(o, self.gs.turn), right_x, yy, small=True)
             yy += 18
 
         # bots + holding
@@ -226,8 +363,8 @@ class Renderer:
         for bot_id, b in sorted(self.gs.bots.items(), key=lambda kv: kv[0]):
             holding = _item_label(b.holding)
             map_team = getattr(b, "map_team", b.team).name
-            self._draw_text(
-                f"bot {bot_id} [{b.team.name}] on={map_team} pos=({b.x},{b.y}) holding={holding or 'None'}",
+            self._draw_text_parts(
+                (f"bot {bot_id} [{b.team.name}] on={map_team} ", f"pos=({b.x},{b.y})", f" holding={holding or 'None'}"),
                 cfg.margin + 8,
                 bot_y,
                 small=True,
@@ -235,6 +372,8 @@ class Renderer:
             )
             bot_y += 16
 
+        return area
+
     def render_once(self, *, fps_cap: int = 30) -> bool:
         """
         Draw one frame. Returns False if user closed window.
@@ -246,20 +385,30 @@ class Renderer:
             if event.type == pygame.QUIT:
                 return False
 
-        self.screen.fill((245, 245, 245))
-
         left_red = self.cfg.margin
         left_blue = self.cfg.margin + self.map_px_w + self.cfg.gap
 
-        # titles
-        self._draw_text("RED MAP", left_red, 2, color=TEAM_COLOR[Team.RED])
-        self._draw_text("BLUE MAP", left_blue, 2, color=TEAM_COLOR[Team.BLUE])
-
-        self._draw_map(Team.RED, left_red)
-        self._draw_map(Team.BLUE, left_blue)
-        self._draw_hud()
-
-        pygame.display.flip()
+        #static layers are built first, a rebuilt one means the whole window is drawn again
+        self._static_layer(Team.RED)
+        self._static_layer(Team.BLUE)
+        self._sync_labels()
+        full = self._needs_full_redraw
+        if full:
+            self.screen.fill(BG_COLOR)
+
+            # titles
+            self._draw_text("RED MAP", left_red, 2, color=TEAM_COLOR[Team.RED])
+            self._draw_text("BLUE MAP", left_blue, 2, color=TEAM_COLOR[Team.BLUE])
+
+        dirty = self._draw_map(Team.RED, left_red)
+        dirty += self._draw_map(Team.BLUE, left_blue)
+        dirty.append(self._draw_hud())
+        self._needs_full_redraw = False
+
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
         self.clock.tick(fps_cap)
         return True
 
@@ -0,0 +1,159 @@
+# render_process.py
+"""
+Runs the pygame Renderer in its own process, so --render no longer throttles the game.
+
+The engine publishes GameState snapshots (GameState.clone(), minus the lookup caches the
+renderer never reads) into a small bounded queue and never waits on it: when the renderer
+falls behind, frames are dropped and it always draws the newest state it has.
+
+Each snapshot carries the engine's GameState.tile_log since the previous snapshot, so the
+renderer only relabels the cells that changed. Frames travel as (version the log starts at,
+snapshot); when one goes missing the chain breaks and the renderer scans the maps again.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from typing import List, Optional, Tuple
+
+from game_state import GameState
+
+
+# ----------------------------
+# Child side
+# ----------------------------
+
+def _join_frames(frames: List[Tuple[Optional[int], GameState]], drawn_version: Optional[int]) -> GameState:
+    '''
+    the newest snapshot, its tile log extended with the logs of the frames skipped before it; if the logs
+    don't run on from the last drawn frame (the engine dropped one) the log is None and the renderer rescans
+    '''
+    log: Optional[dict] = {}
+    for log_since, gs in frames:
+        if log is None or gs.tile_log is None or log_since != drawn_version:
+            log = None
+        else:
+            log.update(gs.tile_log)
+        drawn_version = gs.version
+    gs.tile_log = log
+    return gs
+
+
+def _render_main(frames, closed, fps_cap: int) -> None:
+    '''child process loop: draw the newest snapshot until a None arrives (after drawing the last state) or the window is closed'''
+    from render import Renderer
+
+    renderer: Optional[Renderer] = None
+    #GameState.version of the last snapshot drawn
+    drawn_version: Optional[int] = None
+    try:
+        while True:
+            frame = frames.get()
+            stop = frame is None
+            waiting = [] if stop else [frame]
+            #skip to the newest frame that is already waiting (the last one is still drawn before stopping)
+            try:
+                while not stop:
+                    newer = frames.get_nowait()
+                    if newer is None:
+                        stop = True
+                    else:
+                        waiting.append(newer)
+            except queue.Empty:
+                pass
+
+            if waiting:
+                gs = _join_frames(waiting, drawn_version)
+                drawn_version = gs.version
+                if renderer is None:
+                    renderer = Renderer(gs)
+                renderer.gs = gs
+                if not renderer.render_once(fps_cap=fps_cap):
+                    return
+            if stop:
+                return
+    finally:
+        closed.set()
+        if renderer is not None:
+            renderer.close()
+
+
+def render_snapshot(game_state: GameState) -> GameState:
+    '''
+    copy of the state to send to the renderer; lookup caches are left behind, they only cost pickling time.
+    The copy takes over the tiles logged since the last snapshot and the engine starts a new log
+    '''
+    gs = game_state.clone()
+    for m in (gs.red_map, gs.blue_map):
+        m.distances = None
+        m.nearest_index = {}
+    gs.tile_log = game_state.tile_log
+    game_state.tile_log = {}
+    return gs
+
+
+# ----------------------------
+# Engine side
+# ----------------------------
+
+class RenderProcess:
+    '''
+    Engine handle on the renderer process
+
+    publish() never blocks: it sends at most fps_cap snapshots per second, and when the queue is full
+    the oldest waiting frame is dropped for the new one. It returns False once the window is closed.
+    '''
+
+    def __init__(self, fps_cap: int = 30, queue_size: int = 2):
+        ctx = mp.get_context()
+        self.__frames = ctx.Queue(maxsize=queue_size)
+        self.__closed = ctx.Event()
+        self.__min_interval = 1.0 / fps_cap if fps_cap > 0 else 0.0
+        self.__last_publish = 0.0
+        self.dropped = 0
+        #GameState.version of the last snapshot, where the next one's tile log starts
+        self.__log_since: Optional[int] = None
+        self.__proc = ctx.Process(target=_render_main, args=(self.__frames, self.__closed, fps_cap), daemon=True)
+        self.__proc.start()
+
+    def publish(self, game_state: GameState, *, force: bool = False) -> bool:
+        '''offer the current state for drawing, False if the renderer is gone (window closed)'''
+        if self.__closed.is_set() or not self.__proc.is_alive():
+            return False
+
+        now = time.perf_counter()
+        if not force and now - self.__last_publish < self.__min_interval:
+            self.dropped += 1
+            return True
+        self.__last_publish = now
+
+        frame = (self.__log_since, render_snapshot(game_state))
+        self.__log_since = game_state.version
+        try:
+            self.__frames.put_nowait(frame)
+        except queue.Full:
+            try:
+                self.__frames.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.__frames.put_nowait(frame)
+            except queue.Full:
+                self.dropped += 1
+        return True
+
+    def close(self, timeout_s: float = 2.0) -> None:
+        '''let the renderer draw what it has and exit, kill it if it does not'''
+        if self.__proc.is_alive():
+            try:
+                self.__frames.put(None, timeout=timeout_s)
+            except Exception:
+                pass
+            self.__proc.join(timeout_s)
+        if self.__proc.is_alive():
+            self.__proc.kill()
+            self.__proc.join()
+        self.__frames.close()
@@ -0,0 +1,503 @@
+# replay.py
+"""
+Replay writers.
+
+"json"  : the original single document, buffered in memory and written at the end.
+"jsonl" : streamed, one record per line as turns are produced:
+            {"type": "header", ...switch window...}
+            {"type": "turn", "state": GameState.to_dict()}    (one per turn)
+            {"type": "trailer", "winner": ..., "turns": ..., "index": {...}}
+"delta" : streamed like jsonl, but the static tile layout is written once in the header
+          and turns are stored as diffs against the previous turn:
+            {"type": "header", ..., "layout": {"red_map": [[tile_name]], "blue_map": ...}}
+            {"type": "keyframe", "turn", "team_money", "bots", "orders", "tiles"}   (every keyframe_interval turns)
+            {"type": "delta", "turn", ...only the parts that changed...}
+            {"type": "trailer", "winner": ..., "turns": ...}
+          "tiles" holds [x, y, {dynamic fields}] entries, tiles with no dynamic fields are never written.
+
+The streamed trailers carry an index {"first_turn", "offsets", "keyframes"}: the byte offset of
+every turn record and which records are full states. ReplayReader uses it to seek().
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import json
+import mmap
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from game_constants import REPLAY_FORMATS, Team, TileType
+from game_state import GameState
+
+
+DELTA_VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 50
+
+#tile fields that come from the layout, everything else in Tile.to_dict() is dynamic
+STATIC_TILE_KEYS = ("tile_name", "is_walkable")
+MAP_KEYS = ("red_map", "blue_map")
+
+
+def infer_replay_format(path: str) -> str:
+    '''pick the format from the file extension, defaults to the original json'''
+    return "jsonl" if path.lower().endswith(".jsonl") else "json"
+
+
+def switch_window(game_state: GameState) -> Dict[str, int]:
+    return {
+        "switch_turn_start": game_state.switch_turn,
+        "switch_turn_end": game_state.switch_turn + game_state.switch_duration,
+    }
+
+
+class ReplayWriter(abc.ABC):
+    '''base writer, Game calls begin() once, write_turn() every turn and finish() at the end'''
+
+    def __init__(self, path: str):
+        self.path = path
+        self.turns = 0
+
+    def begin(self, game_state: GameState) -> None:
+        pass
+
+    @abc.abstractmethod
+    def write_turn(self, game_state: GameState) -> None:
+        ...
+
+    @abc.abstractmethod
+    def finish(self, winner: Optional[Team], game_state: GameState) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class JsonReplayWriter(ReplayWriter):
+    '''original format, every turn is kept in memory until the game ends'''
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.replay: List[Dict[str, Any]] = []
+
+    def write_turn(self, game_state: GameState) -> None:
+        self.replay.append(game_state.to_dict())
+        self.turns += 1
+
+    def finish(self, winner: Optional[Team], game_state: GameState) -> None:
+        payload = {
+            "winner": None if winner is None else winner.name,
+            "turns": len(self.replay),
+            **switch_window(game_state),
+            "replay": self.replay,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+
+class JsonlReplayWriter(ReplayWriter):
+    '''streams each turn to disk as it is produced, engine memory stays flat'''
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._f = None
+        self._pos = 0
+
+        #random access index, written into the trailer
+        self.first_turn: Optional[int] = None
+        self.offsets: List[int] = [] #byte offset of every turn record
+        self.keyframes: List[int] = [] #turn record indices that hold a full state
+
+    def _write(self, record: Dict[str, Any]) -> int:
+        '''writes one line, returns the byte offset it starts at'''
+        data = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        pos = self._pos
+        self._f.write(data)
+        self._pos += len(data)
+        return pos
+
+    def _write_turn_record(self, record: Dict[str, Any], game_state: GameState, keyframe: bool) -> None:
+        if self.first_turn is None:
+            self.first_turn = game_state.turn
+        if keyframe:
+            self.keyframes.append(self.turns)
+        self.offsets.append(self._write(record))
+        self.turns += 1
+
+    def begin(self, game_state: GameState) -> None:
+        self._f = open(self.path, "wb")
+        self._write({"type": "header", "format": "jsonl", **switch_window(game_state)})
+
+    def write_turn(self, game_state: GameState) -> None:
+        self._write_turn_record({"type": "turn", "state": game_state.to_dict()}, game_state, keyframe=True)
+
+    def finish(self, winner: Optional[Team], game_state: GameState) -> None:
+        self._write({
+            "type": "trailer",
+            "winner": None if winner is None else winner.name,
+            "turns": self.turns,
+            "index": {"first_turn": self.first_turn, "offsets": self.offsets, "keyframes": self.keyframes},
+        })
+        self.close()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+# ----------------------------
+# Delta encoding
+# ----------------------------
+
+def copy_record(value: Any) -> Any:
+    '''copy of a decoded JSON value, cheaper than copy.deepcopy since it only holds dicts, lists and scalars'''
+    if type(value) is dict:
+        return {k: copy_record(v) for k, v in value.items()}
+    if type(value) is list:
+        return [copy_record(v) for v in value]
+    return value
+
+
+def split_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    '''GameState.to_dict() -> keyed dynamic state, static tile fields dropped'''
+    tiles: Dict[str, Dict[Tuple[int, int], Dict[str, Any]]] = {}
+    for key in MAP_KEYS:
+        dyn_tiles = {}
+        for x, col in enumerate(state[key]):
+            for y, td in enumerate(col):
+                if len(td) > len(STATIC_TILE_KEYS):
+                    dyn_tiles[(x, y)] = {k: v for k, v in td.items() if k not in STATIC_TILE_KEYS}
+        tiles[key] = dyn_tiles
+
+    return {
+        "turn": state["turn"],
+        "team_money": state["team_money"],
+        "bots": {b["bot_id"]: b for b in state["bots"]},
+        "orders": {team: {o["order_id"]: o for o in orders} for team, orders in state["orders"].items()},
+        "tiles": tiles,
+    }
+
+
+def encode_keyframe(cur: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "keyframe",
+        "turn": cur["turn"],
+        "team_money": cur["team_money"],
+        "bots": list(cur["bots"].values()),
+        "orders": {team: list(orders.values()) for team, orders in cur["orders"].items()},
+        "tiles": {key: [[x, y, d] for (x, y), d in cur["tiles"][key].items()] for key in MAP_KEYS},
+    }
+
+
+def encode_delta(prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
+    '''only the entries that differ from the previous turn'''
+    rec: Dict[str, Any] = {"type": "delta", "turn": cur["turn"]}
+
+    if cur["team_money"] != prev["team_money"]:
+        rec["team_money"] = cur["team_money"]
+
+    bots = [b for bid, b in cur["bots"].items() if prev["bots"].get(bid) != b]
+    if bots:
+        rec["bots"] = bots
+
+    orders = {}
+    for team, team_orders in cur["orders"].items():
+        prev_orders = prev["orders"].get(team, {})
+        changed = [o for oid, o in team_orders.items() if prev_orders.get(oid) != o]
+        if changed:
+            orders[team] = changed
+    if orders:
+        rec["orders"] = orders
+
+    tiles = {}
+    for key in MAP_KEYS:
+        prev_tiles = prev["tiles"][key]
+        changed = [[x, y, d] for (x, y), d in cur["tiles"][key].items() if prev_tiles.get((x, y)) != d]
+        if changed:
+            tiles[key] = changed
+    if tiles:
+        rec["tiles"] = tiles
+
+    return rec
+
+
+class DeltaDecoder:
+    '''rebuilds full GameState.to_dict() payloads from a delta header plus keyframe/delta records'''
+
+    def __init__(self, header: Dict[str, Any]):
+        self.layout = header["layout"]
+        names = {name for key in MAP_KEYS for col in self.layout[key] for name in col}
+        self.walkable = {name: TileType[name].is_walkable for name in names}
+        self.cur: Optional[Dict[str, Any]] = None
+
+    def apply(self, rec: Dict[str, Any]) -> None:
+        if rec["type"] == "keyframe":
+            self.cur = {
+                "turn": rec["turn"],
+                "team_money": rec["team_money"],
+                "bots": {b["bot_id"]: b for b in rec["bots"]},
+                "orders": {team: {o["order_id"]: o for o in orders} for team, orders in rec["orders"].items()},
+                "tiles": {key: {(x, y): d for x, y, d in rec["tiles"][key]} for key in MAP_KEYS},
+            }
+            return
+
+        if self.cur is None:
+            raise ValueError(f"delta for turn {rec['turn']} has no keyframe before it")
+
+        cur = self.cur
+        cur["turn"] = rec["turn"]
+        if "team_money" in rec:
+            cur["team_money"] = rec["team_money"]
+        for b in rec.get("bots", []):
+            cur["bots"][b["bot_id"]] = b
+        for team, orders in rec.get("orders", {}).items():
+            team_orders = cur["orders"].setdefault(team, {})
+            for o in orders:
+                team_orders[o["order_id"]] = o
+        for key, changed in rec.get("tiles", {}).items():
+            for x, y, d in changed:
+                cur["tiles"][key][(x, y)] = d
+
+    def state(self) -> Dict[str, Any]:
+        '''current turn in the GameState.to_dict() shape, a copy the caller may change'''
+        cur = self.cur
+        #bot, order and tile records stay in cur for later deltas, so they are copied out, not shared
+        out: Dict[str, Any] = {
+            "turn": cur["turn"],
+            "team_money": dict(cur["team_money"]),
+            "bots": [copy_record(b) for b in cur["bots"].values()],
+            "orders": {team: [copy_record(o) for o in orders.values()] for team, orders in cur["orders"].items()},
+        }
+        for key in MAP_KEYS:
+            #only the few tiles with dynamic fields need a copy, the rest are built fresh from the layout
+            dyn = {xy: copy_record(d) for xy, d in cur["tiles"][key].items()}
+            out[key] = [
+                [
+                    {"tile_name": name, "is_walkable": self.walkable[name], **dyn[(x, y)]} if (x, y) in dyn
+                    else {"tile_name": name, "is_walkable": self.walkable[name]}
+                    for y, name in enumerate(col)
+                ]
+                for x, col in enumerate(self.layout[key])
+            ]
+        return out
+
+
+class DeltaReplayWriter(JsonlReplayWriter):
+    '''streams turns as diffs against the previous turn, with a full keyframe every keyframe_interval turns'''
+
+    def __init__(self, path: str, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        super().__init__(path)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._prev: Optional[Dict[str, Any]] = None
+
+    def begin(self, game_state: GameState) -> None:
+        self._f = open(self.path, "wb")
+        self._write({
+            "type": "header",
+            "format": "delta",
+            "version": DELTA_VERSION,
+            "keyframe_interval": self.keyframe_interval,
+            **switch_window(game_state),
+            "width": game_state.red_map.width,
+            "height": game_state.red_map.height,
+            "layout": {
+                "red_map": [[t.tile_name for t in col] for col in game_state.red_map.tiles],
+                "blue_map": [[t.tile_name for t in col] for col in game_state.blue_map.tiles],
+            },
+        })
+
+    def write_turn(self, game_state: GameState) -> None:
+        cur = split_state(game_state.to_dict())
+        if self._prev is None or self.turns % self.keyframe_interval == 0:
+            self._write_turn_record(encode_keyframe(cur), game_state, keyframe=True)
+        else:
+            self._write_turn_record(encode_delta(self._prev, cur), game_state, keyframe=False)
+        self._prev = cur
+
+
+def make_replay_writer(path: str, fmt: Optional[str] = None) -> ReplayWriter:
+    '''writer factory, fmt=None infers from the extension'''
+    fmt = fmt or infer_replay_format(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fmt == "json":
+        return JsonReplayWriter(path)
+    if fmt == "jsonl":
+        return JsonlReplayWriter(path)
+    if fmt == "delta":
+        return DeltaReplayWriter(path)
+    raise ValueError(f"unknown replay format {fmt!r}, expected one of {REPLAY_FORMATS}")
+
+
+def load_replay(path: str) -> Dict[str, Any]:
+    '''reads any format back into the original json payload shape'''
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline()
+        try:
+            head = json.loads(first)
+        except json.JSONDecodeError:
+            head = None
+
+        #the original format is a single (indented) document
+        if not isinstance(head, dict) or head.get("type") != "header":
+            f.seek(0)
+            return json.load(f)
+
+        decoder = DeltaDecoder(head) if head.get("format") == "delta" else None
+        payload: Dict[str, Any] = {
+            "winner": None,
+            "turns": 0,
+            "switch_turn_start": head["switch_turn_start"],
+            "switch_turn_end": head["switch_turn_end"],
+            "replay": [],
+        }
+        for line in f:
+            rec = json.loads(line)
+            if rec["type"] == "turn":
+                payload["replay"].append(rec["state"])
+            elif rec["type"] in ("keyframe", "delta"):
+                decoder.apply(rec)
+                payload["replay"].append(decoder.state())
+            elif rec["type"] == "trailer":
+                payload["winner"] = rec["winner"]
+
+    payload["turns"] = len(payload["replay"])
+    return payload
+
+
+class ReplayReader:
+    '''
+    Random access over a jsonl or delta replay
+
+    The file is memory-mapped, seek(turn) parses only the nearest keyframe at or before
+    that turn plus the deltas after it. Stepping forward reuses the last decoded turn.
+    '''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: empty replay file")
+
+        try:
+            self.header = self._record_at(0)
+        except ValueError:
+            self.header = None
+        if not isinstance(self.header, dict) or self.header.get("type") != "header":
+            self.close()
+            raise ValueError(f"{path}: not a streamed replay, use load_replay() for json replays")
+
+        self.format = self.header.get("format", "jsonl")
+        self.trailer = self._read_trailer()
+
+        index = self.trailer.get("index") if self.trailer is not None else None
+        if index is None:
+            #game died before the trailer was written, rebuild from the lines themselves
+            index = self._scan_index()
+
+        self.first_turn: int = index["first_turn"] or 0
+        self._offsets: List[int] = index["offsets"]
+        self._keyframes: List[int] = index["keyframes"]
+
+        self._decoder = DeltaDecoder(self.header) if self.format == "delta" else None
+        self._decoded_idx: Optional[int] = None
+
+    # -------------
+    # raw access
+    # -------------
+
+    def _line_end(self, pos: int) -> int:
+        end = self._mm.find(b"\n", pos)
+        return len(self._mm) if end == -1 else end
+
+    def _record_at(self, pos: int) -> Dict[str, Any]:
+        return json.loads(self._mm[pos:self._line_end(pos)])
+
+    def _read_trailer(self) -> Optional[Dict[str, Any]]:
+        end = len(self._mm)
+        if end and self._mm[end - 1] == ord("\n"):
+            end -= 1
+        start = self._mm.rfind(b"\n", 0, end) + 1
+        try:
+            rec = json.loads(self._mm[start:end])
+        except ValueError:
+            return None
+        return rec if rec.get("type") == "trailer" else None
+
+    def _scan_index(self) -> Dict[str, Any]:
+        '''finds record offsets by scanning for newlines, only the first turn record is parsed'''
+        offsets: List[int] = []
+        keyframes: List[int] = []
+        pos = self._line_end(0) + 1
+        size = len(self._mm)
+
+        while pos < size:
+            end = self._mm.find(b"\n", pos)
+            if end == -1:
+                break #partial last line
+            prefix = self._mm[pos:pos + 24]
+            if prefix.startswith(b'{"type":"trailer"'):
+                break
+            if prefix.startswith(b'{"type":"turn"') or prefix.startswith(b'{"type":"keyframe"'):
+                keyframes.append(len(offsets))
+            offsets.append(pos)
+            pos = end + 1
+
+        first_turn = None
+        if offsets:
+            rec = self._record_at(offsets[0])
+            first_turn = rec["state"]["turn"] if rec["type"] == "turn" else rec["turn"]
+        return {"first_turn": first_turn, "offsets": offsets, "keyframes": keyframes}
+
+    # -------------
+    # public API
+    # -------------
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def last_turn(self) -> int:
+        return self.first_turn + len(self._offsets) - 1
+
+    @property
+    def winner(self) -> Optional[str]:
+        return None if self.trailer is None else self.trailer.get("winner")
+
+    def seek(self, turn: int) -> Dict[str, Any]:
+        '''state of the given game turn in the GameState.to_dict() shape'''
+        idx = turn - self.first_turn
+        if not 0 <= idx < len(self._offsets):
+            raise IndexError(f"turn {turn} not in replay (turns {self.first_turn}..{self.last_turn})")
+
+        if self._decoder is None:
+            return self._record_at(self._offsets[idx])["state"]
+
+        key_idx = self._keyframes[bisect.bisect_right(self._keyframes, idx) - 1]
+
+        #keep going from the last decoded turn when it is in the same keyframe span
+        start = key_idx
+        if self._decoded_idx is not None and key_idx <= self._decoded_idx <= idx:
+            start = self._decoded_idx + 1
+
+        for i in range(start, idx + 1):
+            self._decoder.apply(self._record_at(self._offsets[i]))
+        self._decoded_idx = idx
+
+        return self._decoder.state()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -21,6 +21,8 @@ from tiles import Tile, Counter, Sink, SinkTable, Cooker, Trash, Submit, Shop, B
 from item import Item, Food, Plate, Pan
 
 from game_state import GameState
+from views import read_only
+from distances import find_path as plan_path
 
 from typing import Union
 
@@ -35,16 +37,31 @@ class RobotController:
         self.__team = team
         self.__game_state = game_state
 
+        #observation results for one (turn, GameState.version), see __cached
+        self.__obs_stamp: Tuple[int, int] = (-1, -1)
+        self.__obs_cache: Dict[tuple, Any] = {}
+        #map views are live, so one per map object serves every turn (and keeps its tile views)
+        self.__map_views: Dict[Team, Tuple[Map, Map]] = {}
+
+        #find_path results for the current turn, keyed by (map team, start, goals, occupancy version)
+        self.__path_turn = -1
+        self.__path_cache: Dict[tuple, Optional[List[Tuple[int, int]]]] = {}
+
         self.__last_seen_turn: int = game_state.turn #curr turn
         self.__moves_left: Dict[int, int] = {}
         self.__actions_left: Dict[int, int] = {}
         self.__refresh_turn_budgets()
 
+        #clones made for search may rewind their private state, the real controllers may not
+        self.__sandbox = False
+
     # ----------------------------
     # Turn helpers
     # ----------------------------
     def __refresh_turn_budgets(self) -> None:
         '''can only move once AND act once per turn'''
+        self.__game_state.touch_container(self.__moves_left)
+        self.__game_state.touch_container(self.__actions_left)
         for bot_id in self.get_team_bot_ids(self.__team):
             self.__moves_left[bot_id] = 1
             self.__actions_left[bot_id] = 1
@@ -52,6 +69,7 @@ class RobotController:
     def __ensure_turn(self) -> None:
         '''refresh with checks for turn state ie if new turn, add new movements'''
         if self.__game_state.turn != self.__last_seen_turn:
+            self.__game_state.touch_fields(self)
             self.__last_seen_turn = self.__game_state.turn
             self.__refresh_turn_budgets()
 
@@ -63,6 +81,7 @@ class RobotController:
             self.__warn(f"bot {bot_id} has already moved this turn")
             return False
         
+        self.__game_state.touch_container(self.__moves_left)
         self.__moves_left[bot_id] -= 1
         return True
 
@@ -74,9 +93,63 @@ class RobotController:
             self.__warn(f"bot {bot_id} has already acted this turn")
             return False
         
+        self.__game_state.touch_container(self.__actions_left)
         self.__actions_left[bot_id] -= 1
         return True
 
+    # ----------------------------
+    # Forward simulation
+    # ----------------------------
+
+    def clone(self) -> RobotController:
+        '''
+        controller over a private copy of the game (GameState.clone()) with the same move/action budgets;
+        actions on it never affect the real game, use it instead of copy.deepcopy(controller) for search
+        '''
+        rc = RobotController(self.__team, self.__game_state.clone())
+        rc.__last_seen_turn = self.__last_seen_turn
+        rc.__moves_left = dict(self.__moves_left)
+        rc.__actions_left = dict(self.__actions_left)
+        rc.__sandbox = True
+        return rc
+
+    def start_journal(self) -> bool:
+        '''
+        clones only: record every change made through this controller (and its GameState) so a search can
+        apply an action, evaluate it and roll back with undo(mark) in time proportional to the change
+
+            sim = controller.clone()
+            sim.start_journal()
+            mark = sim.journal_mark()
+            sim.move(bot_id, 1, 0)
+            ...evaluate...
+            sim.undo(mark)
+        '''
+        if not self.__sandbox:
+            self.__warn("start_journal() failed: only allowed on controller.clone()")
+            return False
+        self.__game_state.start_journal()
+        return True
+
+    def journal_mark(self) -> Optional[int]:
+        '''position to undo back to, None if the journal is not running'''
+        if not self.__sandbox or self.__game_state.journal is None:
+            self.__warn("journal_mark() failed: call start_journal() on a clone first")
+            return None
+        return self.__game_state.journal_mark()
+
+    def undo(self, mark: int) -> bool:
+        '''rewind to a journal_mark(), including move/action budgets'''
+        if not self.__sandbox:
+            self.__warn("undo() failed: only allowed on controller.clone()")
+            return False
+        try:
+            self.__game_state.undo_to(mark)
+        except Exception as e:
+            self.__warn(f"undo() failed: {e}")
+            return False
+        return True
+
     # ----------------------------
     # General safe state access
     # ----------------------------
@@ -90,12 +163,37 @@ class RobotController:
     def get_enemy_team(self) -> Team:
         return Team.RED if self.__team == Team.BLUE else Team.BLUE
 
+    # observation results below are cached until the game state changes (turn or version);
+    # they are stored as read-only views and handed out as is, copy.deepcopy() one to edit it
+
+    def __cached(self, key: tuple) -> Any:
+        '''cached result for key, None if missing or the state changed since it was stored'''
+        gs = self.__game_state
+        stamp = (gs.turn, gs.version)
+        if stamp != self.__obs_stamp:
+            self.__obs_stamp = stamp
+            self.__obs_cache = {}
+            return None
+        return self.__obs_cache.get(key)
+
+    def __store(self, key: tuple, value: Any) -> Any:
+        view = self.__obs_cache[key] = read_only(value)
+        return view
+
     def get_map(self, team: Team) -> Map:
-        '''Deep copy for the user'''
-        return copy.deepcopy(self.__game_state.get_map(team))
+        '''read-only view of the live map (no copy), copy.deepcopy() it for a map you can change'''
+        m = self.__game_state.get_map(team)
+        cached = self.__map_views.get(team)
+        if cached is None or cached[0] is not m:
+            cached = self.__map_views[team] = (m, read_only(m))
+        return cached[1]
 
     def get_orders(self, team: Team) -> List[Dict[str, Any]]:
-        '''returns list of dictionaries (each order is represented by the dictionary)'''
+        '''returns list of dictionaries (each order is represented by the dictionary), read-only'''
+        cached = self.__cached(("orders", team))
+        if cached is not None:
+            return cached
+
         res = []
         for o in self.__game_state.orders.get(team, []):
             res.append(
@@ -111,18 +209,29 @@ class RobotController:
                     "is_active": o.is_active(self.__game_state.turn),
                 }
             )
-        return res
+        return self.__store(("orders", team), res)
 
     def get_team_bot_ids(self, team: Team) -> List[int]:
         '''returns bot ids of a specified team as a list'''
-        return [bot_id for bot_id, b in self.__game_state.bots.items() if b.team == team]
+        cached = self.__cached(("bot_ids", team))
+        if cached is not None:
+            return cached
+        return self.__store(("bot_ids", team), [bot_id for bot_id, b in self.__game_state.bots.items() if b.team == team])
 
     def get_team_money(self, team: Team) -> int:
         '''returns money for a team (yours and your opponent's)'''
         return self.__game_state.get_team_money(team)
 
+    def get_state_hash(self) -> int:
+        '''64-bit hash of the position (bots, tile items, cookers, sinks, money), equal positions hash equal'''
+        return self.__game_state.state_hash()
+
     def get_bot_state(self, bot_id: int) -> Optional[Dict[str, Any]]:
         '''returns a dictionary of bot state as a dictionary; note holding provides a dictionary too'''
+        cached = self.__cached(("bot", bot_id))
+        if cached is not None:
+            return cached
+
         try:
             b = self.__game_state.get_bot(bot_id)
         except Exception:
@@ -132,7 +241,7 @@ class RobotController:
         if b is None:
             return None
         
-        return {
+        return self.__store(("bot", bot_id), {
             "bot_id": b.bot_id,
             "team": b.team.name,
             "x": b.x,
@@ -140,17 +249,60 @@ class RobotController:
             "team_money": self.__game_state.get_team_money(b.team),
             "holding": self.item_to_public_dict(b.holding),
             "map_team": getattr(b, "map_team", b.team).name,
-        }
+        })
 
     def get_tile(self, team: Team, x: int, y: int) -> Optional[Tile]:
         '''Get the tile at a specific x, y'''
         try:
             t = self.__game_state.get_tile(team, x, y)
-            return copy.deepcopy(t)
-        
+            return read_only(t)
+
         except Exception:
             return None
 
+    def get_nearest_tile(self, team: Team, tile_name: str, x: int, y: int) -> Optional[Tuple[int, int]]:
+        '''(x, y) of the closest tile named tile_name (eg "SINKTABLE") to (x, y) by Chebyshev distance, None if the map has none'''
+        return self.__game_state.get_map(team).nearest_tile(tile_name, x, y)
+
+    def get_distance(self, team: Team, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[int]:
+        '''moves needed to walk from cell a to cell b on a team's map (8 directions, other bots ignored), None if unreachable'''
+        return self.__game_state.get_map(team).get_distances().distance(a[0], a[1], b[0], b[1])
+
+    def get_next_step(self, team: Team, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        '''(dx, dy) for move() that starts a shortest walk from a to b, None if a == b or b is unreachable'''
+        return self.__game_state.get_map(team).get_distances().next_step(a[0], a[1], b[0], b[1])
+
+    def find_path(self, bot_id: int, goal: Union[Tuple[int, int], List[Tuple[int, int]]], avoid_bots: bool = True) -> Optional[List[Tuple[int, int]]]:
+        '''
+        shortest walk for a bot on the map it is standing on, to goal or the closest of a list of goal cells;
+        with avoid_bots, cells where other bots stand right now are blocked.
+        returns the cells to step through (goal last), [] if already there, None if no goal is reachable
+        '''
+        gs = self.__game_state
+        try:
+            b = gs.get_bot(bot_id)
+        except Exception:
+            self.__warn(f"Invalid bot_id {bot_id}")
+            return None
+
+        goals = [tuple(goal)] if len(goal) == 2 and isinstance(goal[0], int) else [tuple(g) for g in goal]
+
+        if gs.turn != self.__path_turn:
+            self.__path_turn = gs.turn
+            self.__path_cache = {}
+        key = (b.map_team, b.x, b.y, tuple(goals), gs.occupancy_version if avoid_bots else None)
+        if key in self.__path_cache:
+            path = self.__path_cache[key]
+            return None if path is None else list(path)
+
+        blocked = None
+        if avoid_bots:
+            blocked = {(o.x, o.y) for o in gs.bots.values() if o.bot_id != bot_id and o.map_team == b.map_team}
+
+        path = plan_path(gs.get_map(b.map_team).get_distances(), (b.x, b.y), goals, blocked)
+        self.__path_cache[key] = path
+        return None if path is None else list(path)
+
     # ----------------------------
     # targeting helpers
     # ----------------------------
@@ -246,6 +398,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         #CONSIDER BOX
         if isinstance(tile, Box):
@@ -290,7 +443,8 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
-        
+        self.__touch(b, target_x, target_y)
+
 
         #COOKER SPECIAL CASE for pan with food on cooker
         #swap current cooker pan into bot's holding space
@@ -407,6 +561,8 @@ class RobotController:
             self.__warn(f"trash() failed: target ({target_x},{target_y}) is not trash tile for bot {bot_id}")
             return False
 
+        self.__game_state.touch_bot(b)
+
         if isinstance(b.holding, Plate):
             b.holding = Plate([], False) #clean plate
         elif isinstance(b.holding, Pan):
@@ -440,6 +596,8 @@ class RobotController:
             self.__warn(f'buy() failed: bot {bot_id} needs to be holding nothing to buy')
             return False
 
+        self.__game_state.touch_bot(b)
+
         if isinstance(item, FoodType):
             b.holding = Food(item)
             return True
@@ -546,6 +704,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, Counter):
             self.__warn(f"chop() failed: target ({target_x},{target_y}) must be COUNTER for bot {bot_id}")
@@ -603,6 +762,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, Cooker):
             self.__warn(f"start_cook() failed: target ({target_x},{target_y}) must be cooker tile for bot {bot_id}")
@@ -649,6 +809,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, Cooker):
             self.__warn(f"take_from_pan(): target ({target_x},{target_y}) must be COOKER bot={bot_id}")
@@ -685,6 +846,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, SinkTable):
             self.__warn(f"take_clean_plate() failed: target ({target_x},{target_y}) must be a sinktable for bot {bot_id}")
@@ -713,6 +875,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, Sink):
             self.__warn(f"put_dirty_plate_in_sink() failed: target ({target_x},{target_y}) must be a sink tile for bot {bot_id}")
@@ -735,6 +898,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         if not isinstance(tile, Sink):
             self.__warn(f"wash_sink(): target ({target_x},{target_y}) must be sink tile bot {bot_id}")
@@ -758,6 +922,7 @@ class RobotController:
         if tgt is None:
             return False
         target_x, target_y, tile = tgt
+        self.__touch(b, target_x, target_y)
 
         #plate if user is holidng a plate and is targetting food
         if isinstance(b.holding, Plate):
@@ -920,6 +1085,11 @@ class RobotController:
         return (type(it).__name__,)
 
 
+    def __touch(self, b, target_x: int, target_y: int) -> None:
+        '''tell the game state the bot and its target tile are about to change (undo journal)'''
+        self.__game_state.touch_bot(b)
+        self.__game_state.touch_tile(b.map_team, target_x, target_y)
+
     def __warn(self, msg: str) -> None:
         '''warn string'''
         #print(f"[RC for {self.__team.name} WARN]: {msg}")
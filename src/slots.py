@@ -0,0 +1,64 @@
+# slots.py
+"""
+Helpers for classes that keep their attributes in __slots__ instead of a per-instance __dict__
+(tiles, items, BotState, Order). Code that used to copy obj.__dict__ wholesale (clone(), the undo
+journal) goes through these, and they fall back to __dict__ for objects that still have one.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def slot_names(cls: type) -> Tuple[str, ...]:
+    '''every slot of cls and its bases, base classes first (cached per class)'''
+    names = _NAMES.get(cls)
+    if names is None:
+        seen: Dict[str, None] = {}
+        for c in reversed(cls.__mro__):
+            slots = c.__dict__.get("__slots__", ())
+            for name in ((slots,) if isinstance(slots, str) else slots):
+                if name not in ("__dict__", "__weakref__"):
+                    seen[name] = None
+        names = tuple(seen)
+        _NAMES[cls] = names
+    return names
+
+
+def get_fields(obj: Any) -> Dict[str, Any]:
+    '''copy of an object's attributes, unset slots are left out'''
+    d = getattr(obj, "__dict__", None)
+    if d is not None:
+        return dict(d)
+    out = {}
+    for name in slot_names(type(obj)):
+        try:
+            out[name] = getattr(obj, name)
+        except AttributeError:
+            pass
+    return out
+
+
+def set_fields(obj: Any, fields: Dict[str, Any]) -> None:
+    '''make obj's attributes exactly fields again (inverse of get_fields)'''
+    d = getattr(obj, "__dict__", None)
+    if d is not None:
+        d.clear()
+        d.update(fields)
+        return
+    for name in slot_names(type(obj)):
+        if name in fields:
+            setattr(obj, name, fields[name])
+        elif hasattr(obj, name):
+            delattr(obj, name)
+
+
+def copy_fields(src: Any, dst: Any) -> None:
+    '''shallow copy of every set attribute of src onto dst (same class)'''
+    for name in slot_names(type(src)):
+        try:
+            setattr(dst, name, getattr(src, name))
+        except AttributeError:
+            pass
@@ -6,17 +6,40 @@ from item import Item, Pan, Food, Plate
 '''Each class describes the current STATE of a tile. Robot controller describes how the state changes through bot actions'''
 
 class Tile:
+  #static properties (name, id, walkable, ...) are read from the shared TileType (flyweight),
+  #instances only hold what can change during a game, so tiles stay small and quick to copy
+  __slots__ = ("tile_type", "item", "using")
+
   def __init__(self, tile_type: TileType):
-    self.tile_name = tile_type.tile_name
-    self.tile_id = tile_type.tile_id
-    self.is_walkable = tile_type.is_walkable
-    self.is_dangerous = tile_type.is_dangerous
-    self.is_placeable = tile_type.is_placeable
-    self.is_interactable = tile_type.is_interactable
+    self.tile_type = tile_type
 
     self.item = None #what item is on the tile
     self.using = False #whether the tile is "in use" or not
 
+  @property
+  def tile_name(self) -> str:
+      return self.tile_type.tile_name
+
+  @property
+  def tile_id(self) -> int:
+      return self.tile_type.tile_id
+
+  @property
+  def is_walkable(self) -> bool:
+      return self.tile_type.is_walkable
+
+  @property
+  def is_dangerous(self) -> bool:
+      return self.tile_type.is_dangerous
+
+  @property
+  def is_placeable(self) -> bool:
+      return self.tile_type.is_placeable
+
+  @property
+  def is_interactable(self) -> bool:
+      return self.tile_type.is_interactable
+
   def to_dict(self):
       '''basic JSON'''
       return {
@@ -25,33 +48,48 @@ class Tile:
           #no using
       }
 
+  def clone(self) -> "Tile":
+      '''shallow copy of the tile state with its own copy of the item (shop menus etc. stay shared)'''
+      #subclasses with their own slots extend this, plain attribute copies are much faster than a generic loop
+      t = self.__class__.__new__(self.__class__)
+      t.tile_type = self.tile_type
+      t.item = self.item.clone() if self.item is not None else None
+      t.using = self.using
+      return t
+
 class Placeable(Tile):
   '''
   Tiles that we can place objects on (ie counters)
   '''
-  def __init__(self, tile_type: TileType):
-    super().__init__(tile_type)
-    self.placeable = True
+  __slots__ = ()
+
+  placeable = True
 
 class Interactable(Tile):
   '''Tiles that we can interact with (ie cooker)'''
-  def __init__(self, tile_type: TileType):
-    super().__init__(tile_type)
-    self.placeable = True
-    self.interactable = True
+  __slots__ = ()
+
+  placeable = True
+  interactable = True
 
 
 class Floor(Tile):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TileType.FLOOR)
 
 
 class Wall(Tile):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TileType.WALL)
 
 
 class Counter(Interactable):
+   __slots__ = ()
+
    def __init__(self):
         super().__init__(TileType.COUNTER)
         self.item = None #only 1 item can be on a counter, None = no item on counter 
@@ -62,11 +100,18 @@ class Counter(Interactable):
        return d
 
 class Box(Interactable):
+    __slots__ = ("count",)
+
     def __init__(self):
         super().__init__(TileType.BOX)
         self.item = None #this is the item to put in that needs to match
         self.count = 0 #if count = 0, self.item needs to be None
 
+    def clone(self) -> "Box":
+        t = super().clone()
+        t.count = self.count
+        return t
+
     def enforce_invar(self):
         if self.count <= 0:
             self.count = 0
@@ -79,11 +124,19 @@ class Box(Interactable):
        return d
 
 class Sink(Interactable):
+    __slots__ = ("num_dirty_plates", "curr_dirty_plate_progress")
+
     def __init__(self):
         super().__init__(TileType.SINK)
         self.num_dirty_plates = 0
         self.curr_dirty_plate_progress = 0
 
+    def clone(self) -> "Sink":
+        t = super().clone()
+        t.num_dirty_plates = self.num_dirty_plates
+        t.curr_dirty_plate_progress = self.curr_dirty_plate_progress
+        return t
+
     def to_dict(self):
        d = super().to_dict()
        d["num_dirty_plates"] = self.num_dirty_plates
@@ -92,21 +145,35 @@ class Sink(Interactable):
        return d
 
 class SinkTable(Interactable):
+    __slots__ = ("num_clean_plates",)
+
     def __init__(self):
         super().__init__(TileType.SINKTABLE)
         self.num_clean_plates = 0 #user can take clean plates
 
+    def clone(self) -> "SinkTable":
+        t = super().clone()
+        t.num_clean_plates = self.num_clean_plates
+        return t
+
     def to_dict(self):
        d = super().to_dict()
        d["num_clean_plates"] = self.num_clean_plates
        return d
 
 class Cooker(Interactable):
+    __slots__ = ("cook_progress",)
+
     def __init__(self):
         super().__init__(TileType.COOKER)
         self.item = Pan() #empty pan
         self.cook_progress = 0 #ticks every turn
 
+    def clone(self) -> "Cooker":
+        t = super().clone()
+        t.cook_progress = self.cook_progress
+        return t
+
     def to_dict(self):
        d = super().to_dict()
        d["item"] = self.item.to_dict() if self.item else None
@@ -114,14 +181,20 @@ class Cooker(Interactable):
        return d
 
 class Trash(Interactable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TileType.TRASH)
 
 class Submit(Interactable):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TileType.SUBMIT)
         
 class Shop(Interactable):
+    __slots__ = ("shop_items",)
+
     def __init__(self):
         super().__init__(TileType.SHOP)
         self.shop_items = set()
@@ -131,6 +204,11 @@ class Shop(Interactable):
             self.shop_items.add(food)
         for shop_item in ShopCosts:
             self.shop_items.add(shop_item)
+
+    def clone(self) -> "Shop":
+        t = super().clone()
+        t.shop_items = self.shop_items #menu never changes, shared
+        return t
     
     def to_dict(self):
        d = super().to_dict()
@@ -0,0 +1,172 @@
+# tournament.py
+
+'''python src/tournament.py --bots bots/tostiti.py bots/initial_bot1.py --maps "maps/*.txt" --out results.jsonl'''
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from game_constants import Team, GameConstants
+from game import Game
+
+
+@dataclass
+class MatchSpec:
+    '''one (red, blue, map) pairing to be played headless'''
+    red: str
+    blue: str
+    map_path: str
+    turn_limit: int = GameConstants.TOTAL_TURNS
+    per_turn_timeout_s: float = 0.5
+    isolate_bots: bool = False
+    verbose: bool = False
+
+
+def schedule_matches(
+    bot_paths: List[str],
+    map_paths: List[str],
+    *,
+    self_play: bool = False,
+    turn_limit: int = GameConstants.TOTAL_TURNS,
+    per_turn_timeout_s: float = 0.5,
+    isolate_bots: bool = False,
+    verbose: bool = False,
+) -> List[MatchSpec]:
+    '''every ordered (red, blue) pair of bots on every map, so each bot plays both colors'''
+    if self_play:
+        pairs = list(itertools.product(bot_paths, repeat=2))
+    else:
+        pairs = list(itertools.permutations(bot_paths, 2))
+
+    return [
+        MatchSpec(red, blue, map_path, turn_limit, per_turn_timeout_s, isolate_bots, verbose)
+        for map_path in map_paths
+        for red, blue in pairs
+    ]
+
+
+def run_match(spec: MatchSpec) -> Dict[str, Any]:
+    '''plays a single game in the current process and returns its result row'''
+    row: Dict[str, Any] = {
+        "red": spec.red,
+        "blue": spec.blue,
+        "map": spec.map_path,
+        "winner": None,
+        "red_money": None,
+        "blue_money": None,
+        "turns": 0,
+        "seconds": 0.0,
+        "error": None,
+    }
+
+    #the engine is chatty, keep worker output out of the results stream
+    sink = contextlib.nullcontext() if spec.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    t0 = time.time()
+    g = None
+    try:
+        with sink:
+            g = Game(
+                red_bot_path=spec.red,
+                blue_bot_path=spec.blue,
+                map_path=spec.map_path,
+                turn_limit=spec.turn_limit,
+                per_turn_timeout_s=spec.per_turn_timeout_s,
+                isolate_bots=spec.isolate_bots,
+            )
+            winner = g.run_game()
+
+        row["winner"] = None if winner is None else winner.name
+        row["red_money"] = g.game_state.get_team_money(Team.RED)
+        row["blue_money"] = g.game_state.get_team_money(Team.BLUE)
+        row["turns"] = g.game_state.turn
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        if spec.verbose:
+            traceback.print_exc()
+    finally:
+        if g is not None:
+            g.close()
+
+    row["seconds"] = round(time.time() - t0, 3)
+    return row
+
+
+def run_tournament(specs: List[MatchSpec], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    '''runs all matches on a process pool, yields result rows as games finish'''
+    workers = workers or os.cpu_count() or 1
+
+    #no pool overhead for a single worker, handy for debugging bots
+    if workers == 1:
+        for spec in specs:
+            yield run_match(spec)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_match, spec) for spec in specs]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def write_rows(rows: Iterator[Dict[str, Any]], out: TextIO) -> int:
+    '''one json object per line, flushed per game so partial ladders survive a crash'''
+    n = 0
+    for row in rows:
+        out.write(json.dumps(row) + "\n")
+        out.flush()
+        n += 1
+    return n
+
+
+def main():
+    '''parse and run'''
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bots", nargs="+", required=True, help="bot python files (each defines BotPlayer)")
+    ap.add_argument("--maps", required=True, help="glob of map text files, e.g. 'maps/*.txt'")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size (default: core count)")
+    ap.add_argument("--out", default=None, help="output jsonl path, one result row per game (default: stdout)")
+    ap.add_argument("--self-play", action="store_true", help="also play each bot against itself")
+    ap.add_argument("--turns", type=int, default=GameConstants.TOTAL_TURNS, help="turn limit")
+    ap.add_argument("--timeout", type=float, default=0.5, help="per-turn timeout seconds per bot")
+    ap.add_argument("--isolate-bots", action="store_true", help="run each bot in its own process, killed on timeout")
+    ap.add_argument("--verbose", action="store_true", help="keep engine output from each game")
+    args = ap.parse_args()
+
+    map_paths = sorted(glob.glob(args.maps))
+    if not map_paths:
+        ap.error(f"no maps match {args.maps}")
+
+    specs = schedule_matches(
+        args.bots,
+        map_paths,
+        self_play=args.self_play,
+        turn_limit=args.turns,
+        per_turn_timeout_s=args.timeout,
+        isolate_bots=args.isolate_bots,
+        verbose=args.verbose,
+    )
+
+    t0 = time.time()
+    if args.out is None:
+        n = write_rows(run_tournament(specs, args.workers), sys.stdout)
+    else:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            n = write_rows(run_tournament(specs, args.workers), f)
+
+    dt = time.time() - t0
+    print(f"[TOURNAMENT] {n} games on {args.workers} workers in {dt:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# views.py
+"""
+Read-only views of engine objects for bots.
+
+RobotController.get_map / get_tile used to deepcopy on every call. A view wraps
+the real object instead: reads go straight through (nested tiles, items and lists
+come back wrapped too), writes raise ReadOnlyError, and isinstance() still sees the
+wrapped class. Views are live, they show the state at the time of the read.
+copy.deepcopy(view) gives an ordinary mutable copy, eg for a private simulation.
+
+A view compares and hashes like the object it wraps, and keeps the views it hands
+out, so reading the same tile twice through one map view gives the same view.
+"""
+
+from __future__ import annotations
+
+import copy
+import types
+from collections.abc import Mapping, Sequence
+from enum import Enum
+from typing import Any
+
+import numpy as np
+
+
+class ReadOnlyError(AttributeError):
+    pass
+
+
+_PASS_THROUGH = (type(None), bool, int, float, str, bytes, Enum, tuple, frozenset)
+#exact types checked before the isinstance() chain, almost every read is one of these
+_IMMUTABLE = frozenset((type(None), bool, int, float, str, bytes, tuple, frozenset))
+
+
+def read_only(value: Any) -> Any:
+    '''wrap value so it can be read but not changed, immutable values are returned as is'''
+    if type(value) in _IMMUTABLE or isinstance(value, _PASS_THROUGH):
+        return value
+    if type(value) in _VIEW_TYPES:
+        #already a view, don't wrap it twice
+        return value
+    if isinstance(value, np.ndarray):
+        arr = value.view()
+        arr.flags.writeable = False
+        return arr
+    if isinstance(value, list):
+        return SequenceView(value)
+    if isinstance(value, dict):
+        return MappingView(value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return ObjectView(value)
+
+
+_own = object.__getattribute__
+
+
+def _unwrap(value: Any) -> Any:
+    '''the real object behind a view, anything else as is'''
+    if type(value) in _VIEW_TYPES:
+        return _own(value, "_target")
+    return value
+
+
+def _child(cache: dict, key: Any, value: Any) -> Any:
+    '''read_only(value), reusing the view cached under key while it still wraps the same object'''
+    if type(value) in _IMMUTABLE:
+        return value
+    view = cache.get(key)
+    if view is not None and _own(view, "_target") is value:
+        return view
+    view = read_only(value)
+    if view is not value:
+        cache[key] = view
+    return view
+
+
+class ObjectView:
+    '''read-only proxy for a Map, Tile or Item'''
+
+    __slots__ = ("_target", "_views", "_methods")
+
+    def __init__(self, target: Any):
+        object.__setattr__(self, "_target", target)
+        #attribute name -> view of its value, and name -> bound method, see __getattribute__
+        object.__setattr__(self, "_views", {})
+        object.__setattr__(self, "_methods", {})
+
+    @property
+    def __class__(self):
+        #isinstance(view, Cooker) works like it does on the real tile
+        return type(_own(self, "_target"))
+
+    def __getattribute__(self, name: str) -> Any:
+        #every read lands here, not in __getattr__, whose failed lookup first costs about 1us
+        if name in _OBJECT_VIEW_NAMES:
+            return _own(self, name)
+        target = _own(self, "_target")
+        if name == "__dict__":
+            return MappingView(target.__dict__)
+
+        value = getattr(target, name)
+        if type(value) in _IMMUTABLE:
+            return value
+        if isinstance(value, types.MethodType) and value.__self__ is target:
+            methods = _own(self, "_methods")
+            method = methods.get(name)
+            if method is None:
+                if name in getattr(type(target), "VIEW_SAFE_METHODS", ()):
+                    #read-only apart from internal caches, run on the real object and wrap the result
+                    method = lambda *args, **kwargs: read_only(value(*args, **kwargs))
+                else:
+                    #run the method against the view, so it can read but not write
+                    method = types.MethodType(value.__func__, self)
+                methods[name] = method
+            return method
+        return _child(_own(self, "_views"), name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise ReadOnlyError(f"cannot set {name}: this is a read-only view, deepcopy it for a mutable copy")
+
+    def __delattr__(self, name: str) -> None:
+        raise ReadOnlyError(f"cannot delete {name}: this is a read-only view")
+
+    def __eq__(self, other) -> bool:
+        return _own(self, "_target") == _unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(_own(self, "_target"))
+
+    def __repr__(self) -> str:
+        return f"<read-only {_own(self, '_target')!r}>"
+
+    def __copy__(self):
+        return copy.copy(_own(self, "_target"))
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(_own(self, "_target"), memo)
+
+    def __reduce_ex__(self, protocol):
+        #pickles as the real object (eg across the --isolate-bots pipe)
+        return _own(self, "_target").__reduce_ex__(protocol)
+
+
+#names the view answers itself (slots, dunders, isinstance's __class__), everything else reads the target
+_OBJECT_VIEW_NAMES = frozenset(dir(ObjectView))
+
+
+class SequenceView(Sequence):
+    '''read-only proxy for a list (map columns, plate food), elements come back wrapped'''
+
+    __slots__ = ("_target", "_views")
+
+    def __init__(self, target: Any):
+        object.__setattr__(self, "_target", target)
+        #index -> view of the element there, see _child
+        object.__setattr__(self, "_views", {})
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return SequenceView(self._target[i])
+        value = self._target[i]
+        if type(value) in _IMMUTABLE:
+            return value
+        view = self._views.get(i)
+        if view is not None and _own(view, "_target") is value:
+            return view
+        return _child(self._views, i, value)
+
+    def __iter__(self):
+        for i, v in enumerate(self._target):
+            yield v if type(v) in _IMMUTABLE else _child(self._views, i, v)
+
+    def __reversed__(self):
+        for v in reversed(self._target):
+            yield read_only(v)
+
+    def __contains__(self, value) -> bool:
+        return _unwrap(value) in self._target
+
+    def index(self, value, *args) -> int:
+        return self._target.index(_unwrap(value), *args)
+
+    def count(self, value) -> int:
+        return self._target.count(_unwrap(value))
+
+    def __bool__(self) -> bool:
+        return bool(self._target)
+
+    def __add__(self, other):
+        #same result type as the list/tuple on the other side, elements stay wrapped
+        if isinstance(other, (list, SequenceView)):
+            return list(self) + list(other)
+        if isinstance(other, tuple):
+            return tuple(self) + other
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + list(self)
+        if isinstance(other, tuple):
+            return other + tuple(self)
+        return NotImplemented
+
+    def __eq__(self, other) -> bool:
+        return self._target == _unwrap(other)
+
+    __hash__ = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise ReadOnlyError(f"cannot set {name}: this is a read-only view")
+
+    def __repr__(self) -> str:
+        return f"<read-only {self._target!r}>"
+
+    def __copy__(self):
+        return list(self._target)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._target, memo)
+
+    def __reduce_ex__(self, protocol):
+        #the list's own reduce names list as the class, which pickle refuses for a view
+        return (list, (self._target,))
+
+
+class MappingView(Mapping):
+    '''read-only proxy for a dict, values come back wrapped'''
+
+    __slots__ = ("_target", "_views")
+
+    def __init__(self, target: Any):
+        object.__setattr__(self, "_target", target)
+        #key -> view of the value there, see _child
+        object.__setattr__(self, "_views", {})
+
+    def __len__(self) -> int:
+        return len(self._target)
+
+    def __getitem__(self, key):
+        return _child(self._views, key, self._target[key])
+
+    def get(self, key, default=None):
+        return _child(self._views, key, self._target[key]) if key in self._target else default
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __contains__(self, key) -> bool:
+        return key in self._target
+
+    def keys(self):
+        return self._target.keys()
+
+    def values(self):
+        return [_child(self._views, k, v) for k, v in self._target.items()]
+
+    def items(self):
+        return [(k, _child(self._views, k, v)) for k, v in self._target.items()]
+
+    def __eq__(self, other) -> bool:
+        return self._target == _unwrap(other)
+
+    __hash__ = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise ReadOnlyError(f"cannot set {name}: this is a read-only view")
+
+    def __repr__(self) -> str:
+        return f"<read-only {self._target!r}>"
+
+    def __copy__(self):
+        return dict(self._target)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._target, memo)
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (self._target,))
+
+
+_VIEW_TYPES = frozenset((ObjectView, SequenceView, MappingView))
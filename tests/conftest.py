@@ -0,0 +1,30 @@
+# conftest.py
+'''shared setup for the tests, run `python -m pytest -q` from the repo root'''
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from game import new_game_state
+from game_state import GameState
+
+MAP_DIR = os.path.join(ROOT_DIR, "maps")
+BOT_DIR = os.path.join(ROOT_DIR, "bots")
+MAP_NAMES = sorted(f for f in os.listdir(MAP_DIR) if f.endswith(".txt"))
+
+
+@pytest.fixture(autouse=True)
+def no_map_cache(monkeypatch):
+    '''tests always parse the map files, never read or fill the user's map cache'''
+    monkeypatch.setenv("AWAP_MAP_CACHE", "off")
+
+
+def build_game_state(map_name: str) -> GameState:
+    '''the state Game.__init__ builds for maps/<map_name>, without importing any bots'''
+    return new_game_state(os.path.join(MAP_DIR, map_name))[0]
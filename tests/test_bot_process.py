@@ -0,0 +1,156 @@
+# test_bot_process.py
+'''--isolate-bots: the bot runs in a child process behind a ControllerProxy'''
+
+import copy
+import pickle
+import textwrap
+import time
+from collections import Counter
+
+import pytest
+
+from conftest import build_game_state
+
+from bot_process import BotProcess, ControllerProxy
+from game_constants import Team
+from robot_controller import RobotController
+
+#simulates a step with a deepcopy of the controller, like search bots did before clone() existed
+SIMULATING_BOT = textwrap.dedent('''
+    import copy
+
+    class BotPlayer:
+        def __init__(self, map_copy):
+            pass
+
+        def play_turn(self, controller):
+            for bot_id in controller.get_team_bot_ids(controller.get_team()):
+                sim = copy.deepcopy(controller)
+                assert type(sim).__name__ == "RobotController", type(sim)
+                steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if sim.can_move(bot_id, dx, dy)]
+                assert steps and sim.move(bot_id, *steps[0]), "the simulated bot could not move"
+                shallow = copy.copy(controller)
+                assert type(shallow).__name__ == "RobotController", type(shallow)
+                del sim, shallow
+''')
+
+
+#reads the same things over and over in a turn, like a bot's inner loop; asserts fail the turn as a crash
+READING_BOT = textwrap.dedent('''
+    class BotPlayer:
+        def __init__(self, map_copy):
+            pass
+
+        def play_turn(self, controller):
+            team = controller.get_team()
+            maps = [controller.get_map(team) for _ in range(5)]
+            assert all(m is maps[0] for m in maps)
+            bot_id = controller.get_team_bot_ids(team)[0]
+            states = [controller.get_bot_state(bot_id) for _ in range(5)]
+            assert all(s is states[0] for s in states)
+            try:
+                states[0]["x"] = -1
+                raise AssertionError("cached state is writable")
+            except TypeError:
+                pass
+
+            steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if controller.can_move(bot_id, dx, dy)]
+            assert controller.move(bot_id, *steps[0])
+            after = controller.get_bot_state(bot_id)
+            assert (after["x"], after["y"]) == (states[0]["x"] + steps[0][0], states[0]["y"] + steps[0][1])
+            #a move changes no tile, the map is not sent again
+            assert controller.get_map(team) is maps[0]
+''')
+
+#makes a few calls that always cross the pipe (an illegal move), see test_serving_time_is_not_charged
+CALLING_BOT = textwrap.dedent('''
+    N_CALLS = {n_calls}
+
+    class BotPlayer:
+        def __init__(self, map_copy):
+            pass
+
+        def play_turn(self, controller):
+            bot_id = controller.get_team_bot_ids(controller.get_team())[0]
+            for _ in range(N_CALLS):
+                controller.move(bot_id, 0, 0)
+''')
+
+
+class CountingController:
+    '''engine side wrapper that counts (and optionally slows down) the calls a bot process makes'''
+
+    def __init__(self, controller, delay_s: float = 0.0):
+        self.controller = controller
+        self.delay_s = delay_s
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        self.calls[name] += 1
+        time.sleep(self.delay_s)
+        return getattr(self.controller, name)
+
+
+def bot_positions(gs):
+    return {bot_id: (b.x, b.y) for bot_id, b in gs.bots.items()}
+
+
+def test_deepcopy_of_proxy_is_private(tmp_path):
+    bot_path = tmp_path / "simulating_bot.py"
+    bot_path.write_text(SIMULATING_BOT)
+
+    gs = build_game_state("map1.txt")
+    controller = RobotController(Team.RED, gs)
+    proc = BotProcess("simulating_bot", str(bot_path), gs.red_map, init_timeout_s=10.0)
+    try:
+        for _ in range(3):
+            gs.start_turn()
+            before = bot_positions(gs)
+            status, detail = proc.play_turn(controller, gs, timeout_s=10.0)
+            #a shared pipe would show up as "bot process died: EOFError" on the turn after the copy is collected
+            assert status == "ok", detail
+            assert bot_positions(gs) == before
+    finally:
+        proc.close()
+
+
+def test_repeated_reads_stay_in_the_bot_process(tmp_path):
+    bot_path = tmp_path / "reading_bot.py"
+    bot_path.write_text(READING_BOT)
+
+    gs = build_game_state("map1.txt")
+    controller = CountingController(RobotController(Team.RED, gs))
+    proc = BotProcess("reading_bot", str(bot_path), gs.red_map, init_timeout_s=10.0)
+    try:
+        gs.start_turn()
+        status, detail = proc.play_turn(controller, gs, timeout_s=10.0)
+        assert status == "ok", detail
+    finally:
+        proc.close()
+    assert controller.calls["get_map"] == 1
+    assert controller.calls["get_team"] == 1
+    #once before the move and once after
+    assert controller.calls["get_bot_state"] == 2
+
+
+@pytest.mark.parametrize("n_calls,expected", [(3, "ok"), (40, "timeout")])
+def test_serving_time_is_not_charged(tmp_path, n_calls, expected):
+    '''five 0.1s calls fit a 0.2s turn, forty run past the wall-clock limit'''
+    bot_path = tmp_path / "calling_bot.py"
+    bot_path.write_text(CALLING_BOT.format(n_calls=n_calls))
+
+    gs = build_game_state("map1.txt")
+    controller = CountingController(RobotController(Team.RED, gs), delay_s=0.1)
+    proc = BotProcess("calling_bot", str(bot_path), gs.red_map, init_timeout_s=10.0)
+    try:
+        gs.start_turn()
+        status, detail = proc.play_turn(controller, gs, timeout_s=0.2)
+        assert status == expected, detail
+    finally:
+        proc.close()
+
+
+def test_proxy_cannot_be_pickled():
+    proxy = ControllerProxy(conn=None)
+    with pytest.raises(TypeError, match="clone"):
+        pickle.dumps(proxy)
@@ -0,0 +1,200 @@
+# test_distances.py
+'''DistanceMatrix and find_path against a plain BFS on every bundled map, and load cost on big winding maps'''
+
+import random
+import time
+from collections import deque
+
+import numpy as np
+import pytest
+
+from conftest import MAP_NAMES, build_game_state
+
+from distances import DistanceMatrix, find_path
+from game_constants import Team
+from map_processor import load_map_from_txt
+from robot_controller import RobotController
+
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def walkable_cells(m):
+    '''read from the tiles themselves, not from the grids the matrix is built from'''
+    return {(x, y) for x in range(m.width) for y in range(m.height) if m.tiles[x][y].is_walkable}
+
+
+def bfs(cells, start, blocked=frozenset()):
+    '''moves from start to every reachable cell, 8 directions'''
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in NEIGHBOURS:
+            nxt = (x + dx, y + dy)
+            if nxt in cells and nxt not in blocked and nxt not in dist:
+                dist[nxt] = dist[(x, y)] + 1
+                queue.append(nxt)
+    return dist
+
+
+def check_walk(cells, start, path, blocked=frozenset()):
+    '''every step is one king move onto a free walkable cell'''
+    x, y = start
+    for (nx, ny) in path:
+        assert max(abs(nx - x), abs(ny - y)) == 1
+        assert (nx, ny) in cells and (nx, ny) not in blocked
+        x, y = nx, ny
+
+
+def serpentine_layout(width: int, height: int):
+    '''floor columns joined at alternating ends, so the walk between the corners runs through every column'''
+    rows = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            joint = x % 2 == 1 and y == (height - 1 if (x // 2) % 2 == 0 else 0)
+            row.append("." if x % 2 == 0 or joint else "#")
+        rows.append("".join(row))
+    rows[0] = "b" + rows[0][1:]
+    return rows
+
+
+@pytest.fixture(params=MAP_NAMES)
+def game_map(request):
+    return build_game_state(request.param).get_map(Team.RED)
+
+
+def test_matrix_matches_bfs(game_map):
+    cells = walkable_cells(game_map)
+    dm = DistanceMatrix.from_map(game_map)
+    assert len(dm) == len(cells)
+
+    for a in cells:
+        expected = bfs(cells, a)
+        for b in cells:
+            assert dm.distance(*a, *b) == expected.get(b), (a, b)
+
+    wall = next(((x, y) for x in range(game_map.width) for y in range(game_map.height) if (x, y) not in cells), None)
+    if wall is not None:
+        assert dm.distance(*wall, *next(iter(cells))) is None
+        assert dm.distances_from(*wall) is None
+
+
+def test_map_distances_are_read_only(game_map):
+    dm = game_map.get_distances()
+    with pytest.raises(ValueError):
+        dm.index[0, 0] = 0
+    i = dm.cell_index(*next(iter(walkable_cells(game_map))))
+    with pytest.raises(ValueError):
+        dm.row(i)[0] = 0
+
+
+def test_next_step_and_path(game_map):
+    cells = walkable_cells(game_map)
+    dm = game_map.get_distances()
+    rng = random.Random(0)
+    ordered = sorted(cells)
+    for _ in range(200):
+        a, b = rng.choice(ordered), rng.choice(ordered)
+        d = bfs(cells, a).get(b)
+        path = dm.path(*a, *b)
+        if d is None:
+            assert path is None and dm.next_step(*a, *b) is None
+            continue
+        assert len(path) == d
+        assert (path[-1] if path else a) == b
+        assert dm.next_step(*a, *b) == (None if not path else (path[0][0] - a[0], path[0][1] - a[1]))
+        check_walk(cells, a, path)
+
+
+def test_find_path_matches_bfs(game_map):
+    '''shortest around blocked cells, to the closest of several goals'''
+    cells = walkable_cells(game_map)
+    dm = game_map.get_distances()
+    rng = random.Random(1)
+    ordered = sorted(cells)
+    for trial in range(150):
+        start = rng.choice(ordered)
+        goals = rng.sample(ordered, k=min(len(ordered), rng.randint(1, 3)))
+        blocked = set(rng.sample(ordered, k=min(len(ordered), trial % 8))) - {start}
+
+        path = find_path(dm, start, goals, blocked)
+        reach = bfs(cells, start, blocked)
+        dists = [reach[g] for g in goals if g in reach]
+        if not dists:
+            assert path is None, (start, goals, blocked)
+            continue
+        assert path is not None, (start, goals, blocked)
+        assert len(path) == min(dists)
+        assert (path[-1] if path else start) in goals
+        check_walk(cells, start, path, blocked)
+
+
+def test_find_path_edges(game_map):
+    cells = sorted(walkable_cells(game_map))
+    dm = game_map.get_distances()
+    start = cells[0]
+    assert find_path(dm, start, [start]) == []
+    assert find_path(dm, start, [(-1, -1)]) is None
+    #a goal that is itself blocked can't be reached
+    assert find_path(dm, start, [cells[-1]], {cells[-1]}) is None
+    assert dm.distances_from(*start)[start] == 0
+
+
+@pytest.mark.parametrize("map_name", MAP_NAMES)
+def test_controller_find_path_avoids_bots(map_name):
+    gs = build_game_state(map_name)
+    gs.start_turn()
+    rc = RobotController(Team.RED, gs)
+    m = gs.get_map(Team.RED)
+    cells = walkable_cells(m)
+    ordered = sorted(cells)
+    rng = random.Random(2)
+    for bot_id in rc.get_team_bot_ids(Team.RED):
+        b = gs.get_bot(bot_id)
+        others = {(o.x, o.y) for o in gs.bots.values() if o.bot_id != bot_id and o.map_team == b.map_team}
+        reach = bfs(cells, (b.x, b.y), others)
+        for goal in rng.sample(ordered, k=min(len(ordered), 20)):
+            path = rc.find_path(bot_id, goal)
+            assert path == rc.find_path(bot_id, goal) #served from the per-turn cache
+            if goal not in reach:
+                assert path is None
+                continue
+            assert len(path) == reach[goal]
+            check_walk(cells, (b.x, b.y), path, others)
+
+
+@pytest.mark.parametrize("width,height", [(40, 60), (50, 80)])
+def test_winding_map_loads_fast(tmp_path, width, height):
+    '''the old all-sources build took seconds here (one full grid pass per distance step per source)'''
+    path = tmp_path / "serpentine.txt"
+    path.write_text("\n".join(serpentine_layout(width, height)) + "\n")
+
+    t0 = time.perf_counter()
+    m = load_map_from_txt(str(path)).map_obj
+    dm = m.get_distances()
+    a, b = tuple(dm.cell_list[0]), tuple(dm.cell_list[-1])
+    walk = dm.path(*a, *b)
+    elapsed = time.perf_counter() - t0
+
+    cells = walkable_cells(m)
+    assert len(walk) == bfs(cells, a)[b] > len(cells) // 2
+    check_walk(cells, a, walk)
+    assert elapsed < 2.0, f"{elapsed:.2f}s"
+
+
+def test_sparse_large_grid():
+    '''200x200 grid with 2000 scattered floor cells: rows are only built for the cells asked about'''
+    rng = np.random.default_rng(0)
+    walkable = np.zeros((200, 200), dtype=bool)
+    walkable.flat[rng.choice(walkable.size, 2000, replace=False)] = True
+
+    t0 = time.perf_counter()
+    dm = DistanceMatrix(walkable)
+    assert time.perf_counter() - t0 < 2.0
+
+    cells = {tuple(c) for c in dm.cell_list}
+    for a in random.Random(3).sample(sorted(cells), 10):
+        expected = bfs(cells, a)
+        row = dm.row(dm.cell_index(*a))
+        assert {tuple(dm.cell_list[j]): int(d) for j, d in enumerate(row) if d >= 0} == expected
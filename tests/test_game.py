@@ -0,0 +1,38 @@
+# test_game.py
+'''game.py CLI: optional subsystems are only imported when their flag asks for them'''
+
+import json
+import os
+import subprocess
+import sys
+
+from conftest import BOT_DIR, MAP_DIR, SRC_DIR
+
+OPTIONAL = ("replay", "render", "render_process", "bot_process", "pygame")
+
+#runs game.main() in a fresh interpreter, then prints which optional modules got imported
+CHILD = r"""
+import json, sys
+import game
+sys.argv = ["game.py"] + sys.argv[1:]
+game.main()
+print(json.dumps({m: m in sys.modules for m in %r}))
+""" % (OPTIONAL,)
+
+
+def run_cli(*args: str) -> dict:
+    bot = os.path.join(BOT_DIR, "tostiti.py")
+    cmd = [sys.executable, "-c", CHILD, "--red", bot, "--blue", bot, "--map", os.path.join(MAP_DIR, "map1.txt"), "--turns", "3", *args]
+    env = dict(os.environ, AWAP_MAP_CACHE="off")
+    proc = subprocess.run(cmd, cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_headless_run_imports_no_optional_modules():
+    assert run_cli() == {m: False for m in OPTIONAL}
+
+
+def test_replay_flag_imports_replay_only(tmp_path):
+    loaded = run_cli("--replay", str(tmp_path / "game.jsonl"), "--replay-format", "delta")
+    assert loaded == {m: m == "replay" for m in OPTIONAL}
+    assert (tmp_path / "game.jsonl").exists()
@@ -0,0 +1,211 @@
+# test_game_state.py
+'''clone / snapshot / undo journal leave the state and its incremental hash exactly as they were'''
+
+import json
+import os
+import random
+
+import pytest
+
+from conftest import BOT_DIR, MAP_DIR, build_game_state
+
+from game import Game
+from game_constants import Team
+from game_state import tile_key
+from robot_controller import RobotController
+from slots import get_fields
+
+TURNS = 120
+MAPS = ["map1.txt", "throughput.txt", "v1.txt", "chess.txt"]
+
+
+def state_bytes(gs) -> bytes:
+    '''everything a game can change, serialized; equal bytes means equal states'''
+    d = gs.to_dict()
+    d["orders_full"] = [[sorted(get_fields(o).items()) for o in gs.orders[t]] for t in Team]
+    d["occupancy"] = [gs.occupancy[t] for t in Team]
+    d["open_orders"] = [sorted(gs.open_orders[t].items()) for t in Team]
+    d["expiry_timeline"] = sorted(gs.expiry_timeline.items())
+    d["switched"] = [gs.switched[t] for t in Team]
+    d["next_order_id"] = gs.next_order_id
+    d["tick_candidates"] = [list(gs.tick_candidates[t]) for t in Team]
+    return json.dumps(d, sort_keys=True, default=str).encode("utf-8")
+
+
+def controller_bytes(rc) -> bytes:
+    '''move/action budgets, which the journal also rolls back'''
+    budgets = (rc._RobotController__moves_left, rc._RobotController__actions_left, rc._RobotController__last_seen_turn)
+    return json.dumps(budgets, sort_keys=True, default=str).encode("utf-8")
+
+
+def full_hash(gs) -> int:
+    '''from-scratch hash, computed on a clone so the incremental state of gs is left alone'''
+    return gs.clone().recompute_state_hash()
+
+
+def make_game(map_name: str) -> Game:
+    bot = os.path.join(BOT_DIR, "tostiti.py")
+    return Game(bot, bot, os.path.join(MAP_DIR, map_name))
+
+
+def play_turn(g: Game) -> None:
+    '''one turn without the thread timeout, so the game is deterministic under a fixed random seed'''
+    g.game_state.start_turn()
+    g.blue_player.play_turn(g.blue_controller)
+    g.red_player.play_turn(g.red_controller)
+
+
+@pytest.mark.parametrize("map_name", MAPS)
+def test_clone_is_identical_and_independent(map_name):
+    random.seed(0)
+    g = make_game(map_name)
+    for _ in range(TURNS // 2):
+        play_turn(g)
+    gs = g.game_state
+    before = state_bytes(gs)
+
+    sim = gs.clone()
+    assert state_bytes(sim) == before
+    assert sim.state_hash() == gs.state_hash() == full_hash(gs)
+
+    #play the clone forward with its own controllers, the original must not change
+    rcs = [RobotController(team, sim) for team in Team]
+    for _ in range(20):
+        sim.start_turn()
+        for rc in rcs:
+            for bot_id in rc.get_team_bot_ids(rc.get_team()):
+                steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if rc.can_move(bot_id, dx, dy)]
+                if steps:
+                    rc.move(bot_id, *random.choice(steps))
+    assert state_bytes(sim) != before
+    assert state_bytes(gs) == before
+    assert gs.state_hash() == full_hash(gs)
+    assert sim.state_hash() == full_hash(sim)
+
+
+@pytest.mark.parametrize("map_name", MAPS)
+def test_snapshot_restore(map_name):
+    random.seed(0)
+    g = make_game(map_name)
+    gs = g.game_state
+    play_turn(g)
+    snap = gs.snapshot()
+    before = state_bytes(gs)
+    h = gs.state_hash()
+
+    for _ in range(30):
+        play_turn(g)
+    gs.restore(snap)
+    assert state_bytes(gs) == before
+    assert gs.state_hash() == h == full_hash(gs)
+
+    #the snapshot can be restored again
+    for _ in range(10):
+        play_turn(g)
+    gs.restore(snap)
+    assert state_bytes(gs) == before
+
+
+@pytest.mark.parametrize("map_name", MAPS)
+def test_undo_restores_state_and_hash(map_name):
+    '''every turn: play, undo back to the mark, check it is identical, replay it and check the same turn comes out'''
+    random.seed(1)
+    g = make_game(map_name)
+    gs = g.game_state
+    gs.start_journal()
+    for turn in range(TURNS):
+        before = (state_bytes(gs), controller_bytes(g.red_controller), controller_bytes(g.blue_controller))
+        h = gs.state_hash()
+        rng = random.getstate()
+
+        mark = gs.journal_mark()
+        play_turn(g)
+        after = (state_bytes(gs), controller_bytes(g.red_controller), controller_bytes(g.blue_controller))
+        after_hash = gs.state_hash()
+        assert after_hash == full_hash(gs), f"incremental hash drifted on turn {turn}"
+
+        gs.undo_to(mark)
+        assert (state_bytes(gs), controller_bytes(g.red_controller), controller_bytes(g.blue_controller)) == before, f"undo of turn {turn}"
+        assert gs.state_hash() == h == full_hash(gs)
+
+        random.setstate(rng)
+        play_turn(g)
+        assert (state_bytes(gs), controller_bytes(g.red_controller), controller_bytes(g.blue_controller)) == after, f"replay of turn {turn}"
+        assert gs.state_hash() == after_hash
+        gs.journal.clear()
+
+
+def test_nested_marks_undo_in_order():
+    random.seed(2)
+    g = make_game("map1.txt")
+    gs = g.game_state
+    play_turn(g)
+    gs.start_journal()
+
+    saved = []
+    for _ in range(5):
+        saved.append((gs.journal_mark(), state_bytes(gs), gs.state_hash()))
+        play_turn(g)
+    for mark, state, h in reversed(saved):
+        gs.undo_to(mark)
+        assert state_bytes(gs) == state
+        assert gs.state_hash() == h
+
+
+def test_controller_clone_journal():
+    '''the public search API: clone, journal, move, undo'''
+    gs = build_game_state("map1.txt")
+    gs.start_turn()
+    rc = RobotController(Team.RED, gs)
+    real = state_bytes(gs)
+
+    sim = rc.clone()
+    assert sim.start_journal()
+    sim_state = sim._RobotController__game_state
+    before = state_bytes(sim_state)
+    mark = sim.journal_mark()
+    for bot_id in sim.get_team_bot_ids(Team.RED):
+        steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if sim.can_move(bot_id, dx, dy)]
+        assert sim.move(bot_id, *steps[0])
+    assert state_bytes(sim_state) != before
+    assert sim.undo(mark)
+    assert state_bytes(sim_state) == before
+    assert state_bytes(gs) == real
+
+    #the real controller refuses to rewind
+    assert not rc.start_journal()
+    assert not rc.undo(mark)
+
+
+def tile_keys(gs) -> dict:
+    return {(team, x, y): tile_key(team, x, y, m.tiles[x][y])
+            for team, m in ((Team.RED, gs.red_map), (Team.BLUE, gs.blue_map))
+            for x in range(m.width) for y in range(m.height)}
+
+
+@pytest.mark.parametrize("map_name", MAPS)
+def test_tile_log_covers_every_changed_tile(map_name):
+    '''what the renderer relies on to relabel only the changed cells'''
+    random.seed(2)
+    g = make_game(map_name)
+    gs = g.game_state
+    assert gs.tile_log is None
+    gs.tile_log = {}
+    logged = 0
+    for turn in range(TURNS):
+        before = tile_keys(gs)
+        play_turn(g)
+        after = tile_keys(gs)
+        changed = {cell for cell in after if after[cell] != before[cell]}
+        assert changed <= gs.tile_log.keys(), f"turn {turn}: {changed - gs.tile_log.keys()}"
+        logged += len(gs.tile_log)
+        gs.tile_log.clear()
+    assert logged > 0
+
+    #a clone starts without a log, undo drops it (the rollback writes tiles directly)
+    assert gs.clone().tile_log is None
+    gs.start_journal()
+    mark = gs.journal_mark()
+    play_turn(g)
+    gs.undo_to(mark)
+    assert gs.tile_log is None
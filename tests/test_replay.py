@@ -0,0 +1,141 @@
+# test_replay.py
+'''every replay format loads back to the same payload, and ReplayReader.seek is order independent'''
+
+import os
+import random
+
+import pytest
+
+from conftest import BOT_DIR, MAP_DIR
+
+from game import Game
+from game_constants import Team
+from replay import (
+    DeltaReplayWriter,
+    JsonlReplayWriter,
+    JsonReplayWriter,
+    ReplayReader,
+    ReplayWriter,
+    load_replay,
+)
+
+TURNS = 150
+KEYFRAME_INTERVAL = 7 #small, so seeks cross several keyframes
+
+
+def play_and_record(map_name: str, writers, turns: int = TURNS, finish: bool = True) -> None:
+    '''plays one game and feeds every turn to all writers, so they all see the same states'''
+    bot = os.path.join(BOT_DIR, "tostiti.py")
+    g = Game(bot, bot, os.path.join(MAP_DIR, map_name))
+    for w in writers:
+        w.begin(g.game_state)
+    for _ in range(turns):
+        g.game_state.start_turn()
+        g.call_player(Team.BLUE)
+        g.call_player(Team.RED)
+        for w in writers:
+            w.write_turn(g.game_state)
+    for w in writers:
+        if finish:
+            w.finish(Team.RED, g.game_state)
+        else:
+            w.close()
+
+
+@pytest.fixture(scope="module", params=["map1.txt", "throughput.txt"])
+def replays(request, tmp_path_factory):
+    '''the same game written as json, jsonl and delta'''
+    out = tmp_path_factory.mktemp("replays")
+    paths = {
+        "json": str(out / "game.json"),
+        "jsonl": str(out / "game.jsonl"),
+        "delta": str(out / "game.delta.jsonl"),
+    }
+    play_and_record(request.param, [
+        JsonReplayWriter(paths["json"]),
+        JsonlReplayWriter(paths["jsonl"]),
+        DeltaReplayWriter(paths["delta"], keyframe_interval=KEYFRAME_INTERVAL),
+    ])
+    return paths
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "delta"])
+def test_streamed_formats_load_equal_to_json(replays, fmt):
+    expected = load_replay(replays["json"])
+    assert expected["turns"] == TURNS
+    assert load_replay(replays[fmt]) == expected
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "delta"])
+def test_seek_is_order_independent(replays, fmt):
+    states = load_replay(replays["json"])["replay"]
+    turns = [s["turn"] for s in states]
+    expected = dict(zip(turns, states))
+
+    shuffled = turns[:]
+    random.Random(0).shuffle(shuffled)
+    orders = {
+        "forward": turns,
+        "backward": turns[::-1],
+        "shuffled": shuffled,
+        "repeated": [t for t in turns[::5] for _ in range(2)],
+    }
+    for name, order in orders.items():
+        with ReplayReader(replays[fmt]) as r:
+            assert r.winner == Team.RED.name
+            for turn in order:
+                assert r.seek(turn) == expected[turn], f"{name} seek to turn {turn}"
+
+    #a fresh reader per seek decodes from the keyframe only
+    for turn in turns[::9]:
+        with ReplayReader(replays[fmt]) as r:
+            assert r.seek(turn) == expected[turn]
+
+    with ReplayReader(replays[fmt]) as r:
+        with pytest.raises(IndexError):
+            r.seek(r.last_turn + 1)
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "delta"])
+def test_edited_states_do_not_leak_into_later_seeks(replays, fmt):
+    '''a viewer may annotate the state it gets back, later frames must still decode from the file'''
+    expected = {s["turn"]: s for s in load_replay(replays["json"])["replay"]}
+    with ReplayReader(replays[fmt]) as r:
+        turns = list(range(r.first_turn, r.last_turn + 1))
+        for turn in turns:
+            state = r.seek(turn)
+            assert state == expected[turn]
+            for b in state["bots"]:
+                b["x"] = -1
+                b["holding"] = {"type": "edited"}
+            for orders in state["orders"].values():
+                for o in orders:
+                    o["required"].append("edited")
+            for key in ("red_map", "blue_map"):
+                for col in state[key]:
+                    for td in col:
+                        td["edited"] = True
+                        if isinstance(td.get("item"), dict):
+                            td["item"]["edited"] = True
+
+
+@pytest.mark.parametrize("writer_cls", [JsonlReplayWriter, DeltaReplayWriter])
+def test_seek_without_trailer(tmp_path, writer_cls):
+    '''a game that died before finish() is indexed by scanning the file'''
+    path = str(tmp_path / "game.jsonl")
+    play_and_record("map1.txt", [writer_cls(path)], turns=20, finish=False)
+
+    with ReplayReader(path) as r:
+        assert r.trailer is None
+        assert len(r) == 20
+        for i in (19, 3, 11, 0):
+            assert r.seek(r.first_turn + i)["turn"] == r.first_turn + i
+
+
+def test_writer_without_finish_cannot_be_created(tmp_path):
+    class Incomplete(ReplayWriter):
+        def write_turn(self, game_state):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete(str(tmp_path / "game.json"))
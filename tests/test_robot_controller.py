@@ -0,0 +1,71 @@
+# test_robot_controller.py
+'''observation results are cached per (turn, state version) and handed out read-only'''
+
+import copy
+
+import pytest
+
+from conftest import build_game_state
+
+from game_constants import Team
+from robot_controller import RobotController
+
+
+def test_observations_cannot_be_edited():
+    gs = build_game_state("map1.txt")
+    gs.start_turn()
+    rc = RobotController(Team.RED, gs)
+
+    ids = rc.get_team_bot_ids(Team.RED)
+    expected_ids = [bot_id for bot_id, b in gs.bots.items() if b.team == Team.RED]
+    assert ids == expected_ids
+    with pytest.raises(AttributeError):
+        ids.remove(ids[0])
+    #served from the cache as is, no copy per call
+    assert rc.get_team_bot_ids(Team.RED) is ids
+
+    bot_id = expected_ids[0]
+    state = rc.get_bot_state(bot_id)
+    assert state["bot_id"] == bot_id and dict(state)["x"] == state["x"]
+    with pytest.raises(TypeError):
+        state["x"] = -1
+
+    orders = rc.get_orders(Team.RED)
+    assert orders, "map1 has orders"
+    with pytest.raises(AttributeError):
+        orders[0]["required"].append("NOT_A_FOOD")
+    with pytest.raises(TypeError):
+        orders[0]["reward"] = 10 ** 6
+    with pytest.raises(AttributeError):
+        orders.pop()
+
+    #a deepcopy is an ordinary list of dicts to edit
+    mine = copy.deepcopy(orders)
+    mine[0]["required"].append("NOT_A_FOOD")
+    mine.pop()
+    assert rc.get_orders(Team.RED) == orders != mine
+
+
+def test_map_view_is_kept_across_turns():
+    gs = build_game_state("map1.txt")
+    gs.start_turn()
+    rc = RobotController(Team.RED, gs)
+    m = rc.get_map(Team.RED)
+    tile = m.tiles[1][1]
+    gs.start_turn()
+    assert rc.get_map(Team.RED) is m
+    assert m.tiles[1][1] is tile
+
+
+def test_observations_follow_state_changes():
+    gs = build_game_state("map1.txt")
+    gs.start_turn()
+    rc = RobotController(Team.RED, gs)
+    bot_id = rc.get_team_bot_ids(Team.RED)[0]
+
+    before = rc.get_bot_state(bot_id)
+    steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if rc.can_move(bot_id, dx, dy)]
+    dx, dy = steps[0]
+    assert rc.move(bot_id, dx, dy)
+    after = rc.get_bot_state(bot_id)
+    assert (after["x"], after["y"]) == (before["x"] + dx, before["y"] + dy)
@@ -0,0 +1,119 @@
+# test_views.py
+'''read-only views: live reads, no writes, and they compare, hash and index like what they wrap'''
+
+import copy
+import pickle
+from collections.abc import Mapping, Sequence
+
+import pytest
+
+from conftest import build_game_state
+
+from game_constants import FoodType, Team
+from item import Food, Plate
+from tiles import Counter, Tile
+from views import ReadOnlyError, read_only
+
+
+@pytest.fixture
+def game_map():
+    return build_game_state("map1.txt").get_map(Team.RED)
+
+
+def first_tile(m, tile_type):
+    return next((x, y) for x in range(m.width) for y in range(m.height) if isinstance(m.tiles[x][y], tile_type))
+
+
+def test_same_tile_reads_as_same_view(game_map):
+    v = read_only(game_map)
+    assert v.tiles[2][3] is v.tiles[2][3]
+    assert v.tiles[2][3] == v.tiles[2][3]
+    assert v.tiles[2][3] != v.tiles[3][2]
+
+    #views from different parents still compare and hash like the tile
+    other = read_only(game_map)
+    assert other.tiles[2][3] == v.tiles[2][3] == game_map.tiles[2][3]
+    assert game_map.tiles[2][3] == v.tiles[2][3]
+    assert len({v.tiles[2][3], other.tiles[2][3], game_map.tiles[2][3]}) == 1
+    assert isinstance(v.tiles[2][3], Tile)
+
+
+def test_views_are_live_and_read_only(game_map):
+    x, y = first_tile(game_map, Counter)
+    v = read_only(game_map)
+    tile = v.tiles[x][y]
+    assert tile.item is None
+
+    plate = Plate()
+    game_map.tiles[x][y].item = plate
+    assert tile.item == plate
+    assert isinstance(tile.item, Plate)
+    with pytest.raises(ReadOnlyError):
+        tile.item = None
+    with pytest.raises(ReadOnlyError):
+        tile.item.dirty = True
+    with pytest.raises(AttributeError):
+        tile.item.food.append(Food(FoodType.EGG))
+
+    #a new item at the same place is a new view, not the cached old one
+    game_map.tiles[x][y].item = Plate()
+    assert tile.item is not plate and tile.item != plate
+
+
+def test_sequence_view_is_a_full_sequence(game_map):
+    col = read_only(game_map).tiles[1]
+    raw = game_map.tiles[1]
+    assert isinstance(col, Sequence)
+    assert len(col) == len(raw)
+    assert col == raw and raw == col
+    assert col.index(raw[2]) == 2
+    assert col.index(col[2]) == 2
+    assert col.count(raw[2]) == 1
+    assert raw[2] in col and col[2] in col
+    assert list(reversed(col)) == list(reversed(raw))
+    assert col[1:3] == raw[1:3]
+    assert col[-1] == raw[-1]
+
+    joined = [None] + col
+    assert type(joined) is list and joined[1:] == raw
+    assert col + [None] == raw + [None]
+    assert (None,) + col == (None, *raw)
+    #concatenation copies the list, the elements stay read-only
+    with pytest.raises(ReadOnlyError):
+        joined[1].item = None
+    with pytest.raises(TypeError):
+        hash(col)
+
+
+def test_mapping_view():
+    d = {"a": [1, 2], "b": 3}
+    v = read_only(d)
+    assert isinstance(v, Mapping)
+    assert v == d and dict(v) == {"a": [1, 2], "b": 3}
+    assert v["a"] == [1, 2] and v.get("z") is None
+    with pytest.raises(TypeError):
+        v["b"] = 4
+    with pytest.raises(AttributeError):
+        v["a"].append(3)
+
+
+def test_copies_and_pickles_are_real_objects(game_map):
+    v = read_only(game_map)
+    m = copy.deepcopy(v)
+    m.tiles[0][0] = Counter()
+    assert m.tiles[0][0] is not game_map.tiles[0][0]
+    back = pickle.loads(pickle.dumps(v.tiles[0]))
+    assert type(back) is list and len(back) == game_map.height
+    assert type(pickle.loads(pickle.dumps(read_only({"a": [1]})))) is dict
+
+
+def test_safe_methods_run_on_the_target(game_map):
+    v = read_only(game_map)
+    dm = v.get_distances()
+    assert v.get_distances is v.get_distances
+    assert len(dm.cell_list) == int(game_map.walkable.sum())
+    with pytest.raises(ValueError):
+        v.walkable[0, 0] = True
+    #methods that write fail against the view (here on item assignment into a column, like a tuple)
+    with pytest.raises(TypeError):
+        v.set_tile(0, 0, Counter())